@@ -1,13 +1,20 @@
 from logging.config import fileConfig
 
 from alembic import context
-from app.models import ApplicationConfig, TravelDocumentQuery
-from app.session import Base
+from app.models import (
+    ApplicationConfig,
+    PrecomputedCorridor,
+    TravelAnswer,
+    TravelDocumentQuery,
+)
+from app.session import SQLALCHEMY_DATABASE_URL, Base
 from sqlalchemy import engine_from_config, pool
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
+# Migrate the same database the application is configured for (DATABASE_URL)
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,33 @@
+"""persist manual corridor invalidations
+
+Revision ID: 0b6d2e9f4a13
+Revises: f1a8c3e5b907
+Create Date: 2026-10-19 10:22:57.640281
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d2e9f4a13'
+down_revision: Union[str, None] = 'f1a8c3e5b907'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('corridor_invalidations',
+    sa.Column('origin_country', sa.String(length=100), nullable=False),
+    sa.Column('destination_country', sa.String(length=100), nullable=False),
+    sa.Column('invalidated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('origin_country', 'destination_country')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('corridor_invalidations')
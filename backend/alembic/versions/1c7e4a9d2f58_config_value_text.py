@@ -0,0 +1,37 @@
+"""widen application_config.config_value to text
+
+Revision ID: 1c7e4a9d2f58
+Revises: 0b6d2e9f4a13
+Create Date: 2026-10-19 11:05:31.902774
+
+A comma-separated google_api_keys pool outgrows VARCHAR(255) at about six
+keys.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c7e4a9d2f58'
+down_revision: Union[str, None] = '0b6d2e9f4a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('application_config', 'config_value',
+               existing_type=sa.String(length=255),
+               type_=sa.Text(),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('application_config', 'config_value',
+               existing_type=sa.Text(),
+               type_=sa.String(length=255),
+               existing_nullable=False)
@@ -0,0 +1,63 @@
+"""store history answers as jsonb
+
+Revision ID: 3f9d2a6b8e15
+Revises: 8c41f0e27b3a
+Create Date: 2025-08-18 09:41:12.307621
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9d2a6b8e15'
+down_revision: Union[str, None] = '8c41f0e27b3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DOCUMENT_COLUMNS = (
+    'visa_documents',
+    'passport_requirements',
+    'additional_documents',
+    'travel_advisories',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in DOCUMENT_COLUMNS:
+        op.alter_column('travel_document_queries', column,
+               existing_type=sa.Text(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using=f'{column}::jsonb')
+    op.alter_column('precomputed_corridors', 'answer',
+               existing_type=sa.Text(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=False,
+               postgresql_using='answer::jsonb')
+    # Must match TravelDocumentQuery.documents_contain()
+    op.execute(
+        'CREATE INDEX ix_travel_document_queries_documents ON travel_document_queries '
+        'USING gin ((visa_documents || passport_requirements || additional_documents '
+        '|| travel_advisories) jsonb_path_ops)'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_travel_document_queries_documents', table_name='travel_document_queries')
+    op.alter_column('precomputed_corridors', 'answer',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.Text(),
+               existing_nullable=False,
+               postgresql_using='answer::text')
+    for column in DOCUMENT_COLUMNS:
+        op.alter_column('travel_document_queries', column,
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.Text(),
+               existing_nullable=True,
+               postgresql_using=f'{column}::text')
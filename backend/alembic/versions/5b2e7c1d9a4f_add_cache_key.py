@@ -0,0 +1,30 @@
+"""add cache_key to travel_document_queries
+
+Revision ID: 5b2e7c1d9a4f
+Revises: 190cd01d8d09
+Create Date: 2025-08-04 10:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e7c1d9a4f'
+down_revision: Union[str, None] = '190cd01d8d09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('travel_document_queries', sa.Column('cache_key', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_travel_document_queries_cache_key'), 'travel_document_queries', ['cache_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_travel_document_queries_cache_key'), table_name='travel_document_queries')
+    op.drop_column('travel_document_queries', 'cache_key')
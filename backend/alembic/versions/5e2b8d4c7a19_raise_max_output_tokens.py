@@ -0,0 +1,37 @@
+"""raise the default llm_max_output_tokens to 4096
+
+Revision ID: 5e2b8d4c7a19
+Revises: 1c7e4a9d2f58
+Create Date: 2026-10-19 11:48:20.517309
+
+Answers cut off at 1024 tokens are now rejected instead of being repaired
+into incomplete answers, so installs still on the old default move to the
+new one. A value changed by an operator is left alone.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8d4c7a19'
+down_revision: Union[str, None] = '1c7e4a9d2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "UPDATE application_config SET config_value = '4096' "
+        "WHERE config_key = 'llm_max_output_tokens' AND config_value = '1024'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "UPDATE application_config SET config_value = '1024' "
+        "WHERE config_key = 'llm_max_output_tokens' AND config_value = '4096'"
+    )
@@ -0,0 +1,37 @@
+"""add precomputed_corridors
+
+Revision ID: 8c41f0e27b3a
+Revises: 5b2e7c1d9a4f
+Create Date: 2025-08-11 14:03:27.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41f0e27b3a'
+down_revision: Union[str, None] = '5b2e7c1d9a4f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('precomputed_corridors',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('origin_country', sa.String(length=100), nullable=False),
+    sa.Column('destination_country', sa.String(length=100), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_precomputed_corridors_corridor'), 'precomputed_corridors', ['origin_country', 'destination_country'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_precomputed_corridors_corridor'), table_name='precomputed_corridors')
+    op.drop_table('precomputed_corridors')
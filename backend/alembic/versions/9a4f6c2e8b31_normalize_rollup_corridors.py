@@ -0,0 +1,92 @@
+"""key corridor rollups by normalized country names
+
+Revision ID: 9a4f6c2e8b31
+Revises: 5e2b8d4c7a19
+Create Date: 2026-10-19 12:31:06.214857
+
+Rollups were keyed by the names as typed, so "UK" and "United Kingdom"
+counted as two corridors. Existing rows are merged under the normalized
+names the cache key uses; answer changes are summed, so a change at the
+boundary between two merged spellings is not counted. The raw names cannot
+be recovered, so downgrading leaves the rows as they are.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Not a frozen copy like other migrations: it needs the full country tables
+from app.cache import normalize_country
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f6c2e8b31'
+down_revision: Union[str, None] = '5e2b8d4c7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+corridor_stats = sa.table(
+    'corridor_stats',
+    sa.column('origin_country', sa.String(100)),
+    sa.column('destination_country', sa.String(100)),
+    sa.column('queries', sa.Integer()),
+    sa.column('answer_changes', sa.Integer()),
+    sa.column('first_queried_at', sa.DateTime()),
+    sa.column('last_answered_at', sa.DateTime()),
+    sa.column('last_answer_hash', sa.String(64)),
+)
+corridor_daily_stats = sa.table(
+    'corridor_daily_stats',
+    sa.column('origin_country', sa.String(100)),
+    sa.column('destination_country', sa.String(100)),
+    sa.column('day', sa.Date()),
+    sa.column('queries', sa.Integer()),
+    sa.column('answer_changes', sa.Integer()),
+    sa.column('last_answered_at', sa.DateTime()),
+)
+
+
+def _merge(row: dict, into: dict) -> None:
+    newer = row['last_answered_at'] >= into['last_answered_at']
+    for column, value in row.items():
+        if column in ('queries', 'answer_changes'):
+            into[column] += value
+        elif column == 'first_queried_at':
+            into[column] = min(into[column], value)
+        elif column in ('last_answered_at', 'last_answer_hash') and newer:
+            into[column] = value
+
+
+def _rekey(connection, table, extra_keys: Sequence[str]) -> None:
+    merged = {}
+    renamed = False
+    for row in connection.execute(sa.select(table)).mappings():
+        row = dict(row)
+        origin = normalize_country(row['origin_country'])
+        destination = normalize_country(row['destination_country'])
+        renamed |= (origin, destination) != (row['origin_country'], row['destination_country'])
+        row.update(origin_country=origin, destination_country=destination)
+        key = (origin, destination, *(row[column] for column in extra_keys))
+        if key in merged:
+            _merge(row, merged[key])
+        else:
+            merged[key] = row
+    if not renamed:
+        return
+    connection.execute(table.delete())
+    rows = list(merged.values())
+    for start in range(0, len(rows), 5000):
+        connection.execute(table.insert(), rows[start:start + 5000])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    connection = op.get_bind()
+    _rekey(connection, corridor_stats, ())
+    _rekey(connection, corridor_daily_stats, ('day',))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
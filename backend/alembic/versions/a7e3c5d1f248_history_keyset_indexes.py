@@ -0,0 +1,29 @@
+"""index travel_document_queries for keyset pagination
+
+Revision ID: a7e3c5d1f248
+Revises: 3f9d2a6b8e15
+Create Date: 2025-08-21 16:27:05.813442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c5d1f248'
+down_revision: Union[str, None] = '3f9d2a6b8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_travel_document_queries_queried_at', 'travel_document_queries', ['queried_at', 'id'], unique=False)
+    op.create_index('ix_travel_document_queries_corridor', 'travel_document_queries', ['origin_country', 'destination_country', 'queried_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_travel_document_queries_corridor', table_name='travel_document_queries')
+    op.drop_index('ix_travel_document_queries_queried_at', table_name='travel_document_queries')
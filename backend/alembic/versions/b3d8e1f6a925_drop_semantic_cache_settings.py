@@ -0,0 +1,34 @@
+"""drop the semantic cache settings
+
+Revision ID: b3d8e1f6a925
+Revises: 9a4f6c2e8b31
+Create Date: 2026-10-19 14:02:37.840193
+
+The corridor similarity index was removed, so enable_semantic_cache and
+semantic_cache_threshold no longer do anything. Older code re-adds missing
+settings with their defaults at startup, so downgrading leaves them out.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e1f6a925'
+down_revision: Union[str, None] = '9a4f6c2e8b31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "DELETE FROM application_config "
+        "WHERE config_key IN ('enable_semantic_cache', 'semantic_cache_threshold')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    pass
@@ -0,0 +1,40 @@
+"""describe llm_requests_per_minute as a limit on every Gemini call
+
+Revision ID: c6f2a9d4e817
+Revises: b3d8e1f6a925
+Create Date: 2026-10-19 14:40:12.306518
+
+The setting used to throttle batch calls only and its seeded description
+still says so. A description changed by an operator is left alone.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a9d4e817'
+down_revision: Union[str, None] = 'b3d8e1f6a925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_DESCRIPTION = 'Rate limit for batch LLM calls per API key'
+NEW_DESCRIPTION = 'Maximum Gemini calls per minute per API key, for every kind of request'
+
+
+def _replace_description(old: str, new: str) -> None:
+    op.execute(
+        f"UPDATE application_config SET description = '{new}' "
+        f"WHERE config_key = 'llm_requests_per_minute' AND description = '{old}'"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_description(OLD_DESCRIPTION, NEW_DESCRIPTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_description(NEW_DESCRIPTION, OLD_DESCRIPTION)
@@ -0,0 +1,144 @@
+"""store each distinct history answer once, referenced by hash
+
+Revision ID: d4b9f1a2c6e7
+Revises: a7e3c5d1f248
+Create Date: 2026-10-18 10:12:44.508113
+
+Existing rows are backfilled in batches: every answer is hashed exactly as
+app.answers.answer_hash() does, each distinct body is inserted once into
+travel_answers and the row keeps only the hash. Dropped columns only give
+their space back after a table rewrite, so run
+`VACUUM FULL travel_document_queries` (or pg_repack) once this has run.
+
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9f1a2c6e7'
+down_revision: Union[str, None] = 'a7e3c5d1f248'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# Row column -> answer field, in app.decoding.ANSWER_FIELDS order
+DOCUMENT_COLUMNS = {
+    'visa_documents': 'visa_documents',
+    'passport_requirements': 'passport_requirements',
+    'additional_documents': 'additional_documents',
+    'travel_advisories': 'advisories',
+}
+
+queries = sa.table(
+    'travel_document_queries',
+    sa.column('id', postgresql.UUID(as_uuid=True)),
+    sa.column('queried_at', sa.DateTime()),
+    sa.column('answer_hash', sa.String(64)),
+    *(sa.column(column, postgresql.JSONB()) for column in DOCUMENT_COLUMNS),
+)
+answers = sa.table(
+    'travel_answers',
+    sa.column('answer_hash', sa.String(64)),
+    sa.column('body', postgresql.JSONB()),
+    sa.column('created_at', sa.DateTime()),
+)
+
+
+def _answer_hash(body: dict) -> str:
+    # Frozen copy of app.answers.answer_hash(); must keep producing the same digests
+    encoded = json.dumps(body, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _backfill(connection) -> None:
+    last_id = None
+    while True:
+        query = sa.select(queries).order_by(queries.c.id).limit(BACKFILL_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(queries.c.id > last_id)
+        rows = connection.execute(query).mappings().all()
+        if not rows:
+            return
+
+        bodies = {}
+        hashes = []
+        for row in rows:
+            body = {
+                field: list(row[column] or [])
+                for column, field in DOCUMENT_COLUMNS.items()
+            }
+            key = _answer_hash(body)
+            bodies.setdefault(key, (body, row['queried_at']))
+            hashes.append({'row_id': row['id'], 'hash': key})
+
+        connection.execute(
+            postgresql.insert(answers).on_conflict_do_nothing(index_elements=['answer_hash']),
+            [
+                {'answer_hash': key, 'body': body, 'created_at': created_at or datetime.utcnow()}
+                for key, (body, created_at) in bodies.items()
+            ],
+        )
+        connection.execute(
+            queries.update()
+            .where(queries.c.id == sa.bindparam('row_id'))
+            .values(answer_hash=sa.bindparam('hash')),
+            hashes,
+        )
+        last_id = rows[-1]['id']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('travel_answers',
+    sa.Column('answer_hash', sa.String(length=64), nullable=False),
+    sa.Column('body', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('answer_hash')
+    )
+    op.add_column('travel_document_queries', sa.Column('answer_hash', sa.String(length=64), nullable=True))
+
+    _backfill(op.get_bind())
+
+    op.alter_column('travel_document_queries', 'answer_hash',
+               existing_type=sa.String(length=64),
+               nullable=False)
+    op.create_foreign_key('fk_travel_document_queries_answer_hash', 'travel_document_queries',
+                          'travel_answers', ['answer_hash'], ['answer_hash'])
+    op.create_index(op.f('ix_travel_document_queries_answer_hash'), 'travel_document_queries', ['answer_hash'], unique=False)
+    # Must match TravelAnswer.documents_contain()
+    op.execute(
+        'CREATE INDEX ix_travel_answers_body ON travel_answers '
+        'USING gin (body jsonb_path_ops)'
+    )
+    op.drop_index('ix_travel_document_queries_documents', table_name='travel_document_queries')
+    for column in DOCUMENT_COLUMNS:
+        op.drop_column('travel_document_queries', column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in DOCUMENT_COLUMNS:
+        op.add_column('travel_document_queries', sa.Column(column, postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.execute(
+        'UPDATE travel_document_queries AS q SET '
+        + ', '.join(f"{column} = a.body -> '{field}'" for column, field in DOCUMENT_COLUMNS.items())
+        + ' FROM travel_answers AS a WHERE a.answer_hash = q.answer_hash'
+    )
+    op.execute(
+        'CREATE INDEX ix_travel_document_queries_documents ON travel_document_queries '
+        'USING gin ((visa_documents || passport_requirements || additional_documents '
+        '|| travel_advisories) jsonb_path_ops)'
+    )
+    op.drop_index(op.f('ix_travel_document_queries_answer_hash'), table_name='travel_document_queries')
+    op.drop_constraint('fk_travel_document_queries_answer_hash', 'travel_document_queries', type_='foreignkey')
+    op.drop_column('travel_document_queries', 'answer_hash')
+    op.drop_index('ix_travel_answers_body', table_name='travel_answers')
+    op.drop_table('travel_answers')
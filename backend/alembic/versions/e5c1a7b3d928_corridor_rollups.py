@@ -0,0 +1,96 @@
+"""add corridor rollup tables for /api/stats
+
+Revision ID: e5c1a7b3d928
+Revises: d4b9f1a2c6e7
+Create Date: 2026-10-18 14:03:27.190245
+
+The rollups are backfilled from the existing history; from then on the
+history writer keeps them up to date as it inserts rows.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c1a7b3d928'
+down_revision: Union[str, None] = 'd4b9f1a2c6e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# History in answer order per corridor; a change is an answer that differs
+# from the corridor's previous one, as in app.analytics.update_rollups()
+ORDERED_HISTORY = '''
+    WITH ordered AS (
+        SELECT origin_country, destination_country, queried_at, answer_hash,
+               CASE WHEN lag(answer_hash) OVER corridor IS NOT NULL
+                     AND lag(answer_hash) OVER corridor <> answer_hash
+                    THEN 1 ELSE 0 END AS changed,
+               row_number() OVER (PARTITION BY origin_country, destination_country
+                                  ORDER BY queried_at DESC) AS recency
+        FROM travel_document_queries
+        WHERE queried_at IS NOT NULL
+        WINDOW corridor AS (PARTITION BY origin_country, destination_country
+                            ORDER BY queried_at)
+    )
+'''
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('corridor_stats',
+    sa.Column('origin_country', sa.String(length=100), nullable=False),
+    sa.Column('destination_country', sa.String(length=100), nullable=False),
+    sa.Column('queries', sa.Integer(), nullable=False),
+    sa.Column('answer_changes', sa.Integer(), nullable=False),
+    sa.Column('first_queried_at', sa.DateTime(), nullable=False),
+    sa.Column('last_answered_at', sa.DateTime(), nullable=False),
+    sa.Column('last_answer_hash', sa.String(length=64), nullable=False),
+    sa.PrimaryKeyConstraint('origin_country', 'destination_country')
+    )
+    op.create_index('ix_corridor_stats_queries', 'corridor_stats', ['queries'], unique=False)
+    op.create_table('corridor_daily_stats',
+    sa.Column('origin_country', sa.String(length=100), nullable=False),
+    sa.Column('destination_country', sa.String(length=100), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('queries', sa.Integer(), nullable=False),
+    sa.Column('answer_changes', sa.Integer(), nullable=False),
+    sa.Column('last_answered_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('origin_country', 'destination_country', 'day')
+    )
+    op.create_index('ix_corridor_daily_stats_day', 'corridor_daily_stats', ['day'], unique=False)
+
+    op.execute(
+        ORDERED_HISTORY
+        + '''
+        INSERT INTO corridor_stats (origin_country, destination_country, queries,
+                                    answer_changes, first_queried_at, last_answered_at,
+                                    last_answer_hash)
+        SELECT origin_country, destination_country, count(*), sum(changed),
+               min(queried_at), max(queried_at),
+               max(answer_hash) FILTER (WHERE recency = 1)
+        FROM ordered
+        GROUP BY origin_country, destination_country
+        '''
+    )
+    op.execute(
+        ORDERED_HISTORY
+        + '''
+        INSERT INTO corridor_daily_stats (origin_country, destination_country, day,
+                                          queries, answer_changes, last_answered_at)
+        SELECT origin_country, destination_country, queried_at::date, count(*),
+               sum(changed), max(queried_at)
+        FROM ordered
+        GROUP BY origin_country, destination_country, queried_at::date
+        '''
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_corridor_daily_stats_day', table_name='corridor_daily_stats')
+    op.drop_table('corridor_daily_stats')
+    op.drop_index('ix_corridor_stats_queries', table_name='corridor_stats')
+    op.drop_table('corridor_stats')
@@ -0,0 +1,32 @@
+"""record how each history answer was served
+
+Revision ID: f1a8c3e5b907
+Revises: e5c1a7b3d928
+Create Date: 2026-10-19 09:41:12.384016
+
+Every ask now gets a history row, including cache hits and fallbacks; the
+shared cache tier only treats "llm" rows as fresh answers. Existing rows
+were all generated, so they default to "llm".
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8c3e5b907'
+down_revision: Union[str, None] = 'e5c1a7b3d928'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('travel_document_queries', sa.Column('source', sa.String(length=16), server_default='llm', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('travel_document_queries', 'source')
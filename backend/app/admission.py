@@ -0,0 +1,289 @@
+# backend/app/admission.py
+import asyncio
+import math
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, NamedTuple, Optional
+
+from fastapi import Request
+
+from .gateway import LLMUnavailableError
+
+# Priority classes, served strictly in this order
+PRIORITIES = ("interactive", "api", "batch")
+DEFAULT_PRIORITY = "api"
+
+# Weight of the newest hold time in the service-time moving average
+SERVICE_EWMA_ALPHA = 0.2
+# Idle per-client quota buckets are pruned once there are this many
+MAX_TRACKED_CLIENTS = 10000
+
+
+class Client(NamedTuple):
+    id: str
+    priority: str = DEFAULT_PRIORITY
+
+
+def client_for(request: Request, priority: str) -> Client:
+    """
+    Identify the caller by its peer address; `priority` is the endpoint's
+    class. Nothing the caller sends is trusted for either, so behind a reverse
+    proxy run uvicorn with --proxy-headers and --forwarded-allow-ips set to
+    the proxy, which makes the address the real client's.
+    """
+    return Client(request.client.host if request.client else "unknown", priority)
+
+
+class AdmissionRejected(LLMUnavailableError):
+    """Shed by admission control: the queue was full or the wait hit its deadline."""
+
+
+class QuotaExceeded(Exception):
+    """The client used up its per-minute request quota."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("client", "future", "enqueued_at")
+
+    def __init__(self, client: Client, future: asyncio.Future):
+        self.client = client
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class _Quota:
+    """Non-blocking token bucket holding one minute's worth of requests."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float):
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, per_minute: int) -> float:
+        """Take a token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(per_minute, self.tokens + (now - self.updated) * per_minute / 60)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) * 60 / per_minute
+
+
+class AdmissionController:
+    """
+    Gate in front of LLM-bound requests.
+
+    At most `max_active` requests run at once; the rest wait in a bounded
+    queue. Waiters are served strictly by priority class and round-robin
+    across clients within a class, so one busy client cannot starve others.
+    A full queue sheds its lowest-priority waiter (or the newcomer), and a
+    waiter still queued after `queue_timeout_seconds` is shed too; both
+    surface as AdmissionRejected with a Retry-After estimate. Clients beyond
+    `client_requests_per_minute` get QuotaExceeded from check_quota(), which
+    callers run for every request before it queues or joins an in-flight call.
+    """
+
+    def __init__(self):
+        self.max_active = 16
+        self.queue_capacity = 256
+        self.queue_timeout_seconds = 10.0
+        self.client_requests_per_minute = 0
+        self.active = 0
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.service_seconds = 1.0
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITIES
+        }
+        self._quotas: Dict[str, _Quota] = {}
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+
+    def configure(
+        self,
+        max_active: int,
+        queue_capacity: int,
+        queue_timeout_seconds: float,
+        client_requests_per_minute: int,
+    ):
+        self.max_active = max(1, max_active)
+        self.queue_capacity = max(0, queue_capacity)
+        self.queue_timeout_seconds = max(0.1, queue_timeout_seconds)
+        self.client_requests_per_minute = max(0, client_requests_per_minute)
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained."""
+        backlog = (self.queued / self.max_active + 1) * self.service_seconds
+        return max(1, math.ceil(backlog))
+
+    def _reject(self, reason: str, priority: str) -> AdmissionRejected:
+        self.rejected[(priority, reason)] += 1
+        return AdmissionRejected(
+            f"The service is overloaded ({reason.replace('_', ' ')})", self.retry_after()
+        )
+
+    def check_quota(self, client: Client):
+        """Charge one request to the client's quota; raises QuotaExceeded if it is used up."""
+        per_minute = self.client_requests_per_minute
+        if not per_minute:
+            return
+        quota = self._quotas.get(client.id)
+        if quota is None:
+            if len(self._quotas) >= MAX_TRACKED_CLIENTS:
+                self._prune_quotas(per_minute)
+            quota = self._quotas[client.id] = _Quota(per_minute)
+        wait = quota.take(per_minute)
+        if wait:
+            self.rejected[(client.priority, "quota")] += 1
+            raise QuotaExceeded(
+                f"Request quota of {per_minute} per minute exceeded", math.ceil(wait)
+            )
+
+    def _prune_quotas(self, per_minute: int):
+        # A bucket that has refilled completely carries no state worth keeping
+        now = time.monotonic()
+        self._quotas = {
+            client_id: quota
+            for client_id, quota in self._quotas.items()
+            if quota.tokens + (now - quota.updated) * per_minute / 60 < per_minute
+        }
+
+    def _enqueue(self, waiter: _Waiter):
+        clients = self._queues[waiter.client.priority]
+        clients.setdefault(waiter.client.id, deque()).append(waiter)
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+    def _remove(self, waiter: _Waiter):
+        clients = self._queues[waiter.client.priority]
+        waiters = clients.get(waiter.client.id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del clients[waiter.client.id]
+        self.queued -= 1
+
+    def _next_waiter(self) -> Optional[_Waiter]:
+        for priority in PRIORITIES:
+            clients = self._queues[priority]
+            if not clients:
+                continue
+            client_id, waiters = next(iter(clients.items()))
+            waiter = waiters.popleft()
+            # Round-robin: the client goes to the back of its class
+            if waiters:
+                clients.move_to_end(client_id)
+            else:
+                del clients[client_id]
+            self.queued -= 1
+            return waiter
+        return None
+
+    def _evict_for(self, client: Client) -> bool:
+        """Shed the newest waiter of the busiest client in a lower class."""
+        rank = PRIORITIES.index(client.priority)
+        for priority in reversed(PRIORITIES[rank + 1 :]):
+            clients = self._queues[priority]
+            if not clients:
+                continue
+            victim_id = max(clients, key=lambda client_id: len(clients[client_id]))
+            victim = clients[victim_id][-1]
+            self._remove(victim)
+            victim.future.set_exception(self._reject("queue_full", priority))
+            return True
+        return False
+
+    def _dispatch(self):
+        while self.active < self.max_active:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.future.done():
+                continue
+            self.active += 1
+            waiter.future.set_result(None)
+
+    async def _acquire(self, client: Client) -> float:
+        """Take an active slot, queueing if needed; returns the seconds waited."""
+        if self.active < self.max_active and not self.queued:
+            self.active += 1
+            return 0.0
+        if self.queued >= self.queue_capacity and not self._evict_for(client):
+            raise self._reject("queue_full", client.priority)
+
+        waiter = _Waiter(client, asyncio.get_running_loop().create_future())
+        self._enqueue(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.queue_timeout_seconds)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not waiter.future.done():
+            self._abandon(waiter)
+            raise self._reject("deadline", client.priority)
+        waiter.future.result()  # raises if the waiter was evicted
+        return time.monotonic() - waiter.enqueued_at
+
+    def _abandon(self, waiter: _Waiter):
+        if waiter.future.done() and not waiter.future.cancelled():
+            if waiter.future.exception() is None:
+                # The slot was handed over just as the waiter gave up
+                self._release()
+            return
+        waiter.future.cancel()
+        self._remove(waiter)
+
+    def _release(self, held_seconds: Optional[float] = None):
+        if held_seconds is not None:
+            self.service_seconds += SERVICE_EWMA_ALPHA * (held_seconds - self.service_seconds)
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, client: Client) -> AsyncIterator[float]:
+        """Hold an admission slot for the block; yields the seconds spent queued."""
+        waited = await self._acquire(client)
+        self.admitted[client.priority] += 1
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_active": self.max_active,
+            "queued": self.queued,
+            "queue_capacity": self.queue_capacity,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_timeout_seconds": self.queue_timeout_seconds,
+            "client_requests_per_minute": self.client_requests_per_minute,
+            "service_seconds": round(self.service_seconds, 3),
+            "classes": [
+                {
+                    "priority": priority,
+                    "queued": sum(len(waiters) for waiters in self._queues[priority].values()),
+                    "clients": len(self._queues[priority]),
+                    "admitted": self.admitted[priority],
+                    "rejected": {
+                        reason: count
+                        for (klass, reason), count in self.rejected.items()
+                        if klass == priority
+                    },
+                }
+                for priority in PRIORITIES
+            ],
+        }
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,235 @@
+# backend/app/analytics.py
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .answers import UPSERT_INSERTS
+from .cache import normalize_country
+from .models import CorridorDailyStats, CorridorStats, TravelAnswer
+
+Corridor = Tuple[str, str]
+
+
+def _upsert(dialect_insert, model, keys: List[str]):
+    """INSERT rollup rows, adding their counts to any row that already exists."""
+    table = model.__table__
+    stmt = dialect_insert(table)
+    excluded = stmt.excluded
+    newer = excluded.last_answered_at >= table.c.last_answered_at
+    updates = {
+        "queries": table.c.queries + excluded.queries,
+        "answer_changes": table.c.answer_changes + excluded.answer_changes,
+        "last_answered_at": case(
+            (newer, excluded.last_answered_at), else_=table.c.last_answered_at
+        ),
+    }
+    if "last_answer_hash" in table.c:
+        updates["last_answer_hash"] = case(
+            (newer, excluded.last_answer_hash), else_=table.c.last_answer_hash
+        )
+        # Concurrent writers may commit batches out of order
+        updates["first_queried_at"] = case(
+            (excluded.first_queried_at < table.c.first_queried_at, excluded.first_queried_at),
+            else_=table.c.first_queried_at,
+        )
+    return stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+
+
+async def _claim_corridors(
+    db: AsyncSession, dialect_insert, by_corridor: Dict[Corridor, List[dict]]
+) -> Dict[Corridor, str]:
+    """
+    Lock the corridors' rollups and return their last answer hashes, so
+    concurrent writers count changes against each other's last answer.
+
+    A SELECT ... FOR UPDATE locks nothing for a corridor that has no row yet,
+    so the rows are upserted instead: a new corridor gets an empty row (no
+    last answer), an existing one a no-op update, and either way the row
+    stays locked until commit. Rows go in key order to avoid deadlocks.
+    """
+    table = CorridorStats.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["origin_country", "destination_country"],
+        set_={"last_answer_hash": table.c.last_answer_hash},
+    ).returning(table.c.origin_country, table.c.destination_country, table.c.last_answer_hash)
+    claimed = await db.execute(
+        stmt,
+        [
+            {
+                "origin_country": origin,
+                "destination_country": destination,
+                "queries": 0,
+                "answer_changes": 0,
+                "first_queried_at": corridor_rows[0]["queried_at"],
+                "last_answered_at": corridor_rows[0]["queried_at"],
+                "last_answer_hash": "",
+            }
+            for (origin, destination), corridor_rows in sorted(by_corridor.items())
+        ],
+    )
+    return {(origin, destination): h for origin, destination, h in claimed if h}
+
+
+async def update_rollups(db: AsyncSession, rows: List[dict]):
+    """
+    Fold a batch of new history rows into corridor_stats and
+    corridor_daily_stats, in the caller's transaction. Corridors are keyed by
+    their normalized names, as in the cache key. An answer change is a row
+    whose answer differs from the corridor's previous one.
+    """
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None or not rows:
+        return
+
+    by_corridor: Dict[Corridor, List[dict]] = defaultdict(list)
+    for row in rows:
+        corridor = (
+            normalize_country(row["origin_country"]),
+            normalize_country(row["destination_country"]),
+        )
+        by_corridor[corridor].append(row)
+    for corridor_rows in by_corridor.values():
+        corridor_rows.sort(key=lambda row: row["queried_at"])
+
+    last_hashes = await _claim_corridors(db, dialect_insert, by_corridor)
+
+    corridors = []
+    days: Dict[Tuple[str, str, date], dict] = {}
+    for (origin, destination), corridor_rows in by_corridor.items():
+        previous = last_hashes.get((origin, destination))
+        changes = 0
+        for row in corridor_rows:
+            changed = previous is not None and row["answer_hash"] != previous
+            previous = row["answer_hash"]
+            changes += changed
+            day = row["queried_at"].date()
+            daily = days.setdefault(
+                (origin, destination, day),
+                {
+                    "origin_country": origin,
+                    "destination_country": destination,
+                    "day": day,
+                    "queries": 0,
+                    "answer_changes": 0,
+                },
+            )
+            daily["queries"] += 1
+            daily["answer_changes"] += changed
+            daily["last_answered_at"] = row["queried_at"]
+        corridors.append(
+            {
+                "origin_country": origin,
+                "destination_country": destination,
+                "queries": len(corridor_rows),
+                "answer_changes": changes,
+                "first_queried_at": corridor_rows[0]["queried_at"],
+                "last_answered_at": corridor_rows[-1]["queried_at"],
+                "last_answer_hash": previous,
+            }
+        )
+
+    await db.execute(
+        _upsert(dialect_insert, CorridorStats, ["origin_country", "destination_country"]),
+        corridors,
+    )
+    await db.execute(
+        _upsert(
+            dialect_insert,
+            CorridorDailyStats,
+            ["origin_country", "destination_country", "day"],
+        ),
+        list(days.values()),
+    )
+
+
+def get_stats_summary(db: Session) -> dict:
+    queries, corridors, changes, last_answered_at = db.execute(
+        select(
+            func.coalesce(func.sum(CorridorStats.queries), 0),
+            func.count(),
+            func.coalesce(func.sum(CorridorStats.answer_changes), 0),
+            func.max(CorridorStats.last_answered_at),
+        )
+    ).one()
+    return {
+        "queries": queries,
+        "corridors": corridors,
+        "answer_changes": changes,
+        "distinct_answers": db.scalar(select(func.count()).select_from(TravelAnswer)),
+        "last_answered_at": last_answered_at,
+    }
+
+
+def get_top_corridors(db: Session, limit: int, since: Optional[date] = None) -> List[dict]:
+    """Most-asked corridors of all time, or since a day using the daily rollup."""
+    if since is None:
+        rows = db.execute(
+            select(
+                CorridorStats.origin_country,
+                CorridorStats.destination_country,
+                CorridorStats.queries,
+                CorridorStats.answer_changes,
+                CorridorStats.last_answered_at,
+            )
+            .order_by(CorridorStats.queries.desc())
+            .limit(limit)
+        )
+    else:
+        total = func.sum(CorridorDailyStats.queries)
+        rows = db.execute(
+            select(
+                CorridorDailyStats.origin_country,
+                CorridorDailyStats.destination_country,
+                total,
+                func.sum(CorridorDailyStats.answer_changes),
+                func.max(CorridorDailyStats.last_answered_at),
+            )
+            .where(CorridorDailyStats.day >= since)
+            .group_by(
+                CorridorDailyStats.origin_country, CorridorDailyStats.destination_country
+            )
+            .order_by(total.desc())
+            .limit(limit)
+        )
+    return [
+        {
+            "origin": origin,
+            "destination": destination,
+            "queries": queries,
+            "answer_changes": changes,
+            "last_answered_at": last_answered_at,
+        }
+        for origin, destination, queries, changes, last_answered_at in rows
+    ]
+
+
+def get_daily_stats(
+    db: Session,
+    since: date,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+) -> List[dict]:
+    """Queries and answer changes per day, overall or for matching corridors."""
+    query = select(
+        CorridorDailyStats.day,
+        func.sum(CorridorDailyStats.queries),
+        func.sum(CorridorDailyStats.answer_changes),
+    ).where(CorridorDailyStats.day >= since)
+    if origin:
+        query = query.where(CorridorDailyStats.origin_country == normalize_country(origin))
+    if destination:
+        query = query.where(
+            CorridorDailyStats.destination_country == normalize_country(destination)
+        )
+    rows = db.execute(
+        query.group_by(CorridorDailyStats.day).order_by(CorridorDailyStats.day)
+    )
+    return [
+        {"day": day, "queries": queries, "answer_changes": changes}
+        for day, queries, changes in rows
+    ]
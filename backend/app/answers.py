@@ -0,0 +1,53 @@
+# backend/app/answers.py
+import hashlib
+import json
+from typing import Dict
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .decoding import ANSWER_FIELDS
+from .models import TravelAnswer
+
+# Dialects with INSERT ... ON CONFLICT, for idempotent and incremental writes
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def canonical_answer(result: dict) -> dict:
+    """The stored part of an answer: its document lists, without metadata."""
+    return {field: list(result[field]) for field in ANSWER_FIELDS}
+
+
+def answer_hash(body: dict) -> str:
+    """Content address of an answer body; equal answers always hash the same."""
+    encoded = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def store_answers(db: AsyncSession, bodies: Dict[str, dict]):
+    """
+    Insert the answer bodies (keyed by hash) that are not stored yet. Safe to
+    run concurrently from several workers.
+    """
+    if not bodies:
+        return
+    rows = [{"answer_hash": key, "body": body} for key, body in bodies.items()]
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        await db.execute(
+            dialect_insert(TravelAnswer).on_conflict_do_nothing(
+                index_elements=[TravelAnswer.answer_hash]
+            ),
+            rows,
+        )
+        return
+
+    stored = set(
+        await db.scalars(
+            select(TravelAnswer.answer_hash).where(TravelAnswer.answer_hash.in_(bodies))
+        )
+    )
+    missing = [row for row in rows if row["answer_hash"] not in stored]
+    if missing:
+        await db.execute(insert(TravelAnswer), missing)
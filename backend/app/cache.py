@@ -0,0 +1,251 @@
+# backend/app/cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import exists, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .countries import resolve_country
+from .models import CorridorInvalidation, PrecomputedCorridor, TravelDocumentQuery
+
+INVALIDATION_CHANNEL = "corridor_invalidated"
+
+
+class CacheKey(NamedTuple):
+    origin: str
+    destination: str
+    language: str
+    model: str
+    temperature: str
+
+    @property
+    def corridor(self) -> Tuple[str, str]:
+        return self.origin, self.destination
+
+    @property
+    def digest(self) -> str:
+        """Stable hash of the key, stored on history rows for shared lookups."""
+        return hashlib.sha256("|".join(self).encode("utf-8")).hexdigest()
+
+
+def normalize_country(name: str) -> str:
+    """
+    Canonical cache form of a country name, so "UK", "Great Britain" and
+    "united kingdom" share an entry. Unknown names only have their whitespace
+    and case folded.
+    """
+    return (resolve_country(name) or " ".join(name.split())).casefold()
+
+
+def make_cache_key(
+    origin: str, destination: str, language: str, model: str, temperature: float
+) -> CacheKey:
+    return CacheKey(
+        origin=normalize_country(origin),
+        destination=normalize_country(destination),
+        language=" ".join(language.split()).casefold(),
+        model=model.strip(),
+        temperature=f"{float(temperature):.2f}",
+    )
+
+
+class ResponseCache:
+    """Thread-safe in-process LRU cache of /api/ask results with a TTL."""
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, max_entries: int, ttl_seconds: int):
+        with self._lock:
+            self.max_entries = max(0, max_entries)
+            self.ttl_seconds = max(0, ttl_seconds)
+            self._evict()
+
+    def get(self, key: CacheKey) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            # Expired entries stay until evicted: they are the fallback answers
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: CacheKey, value: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def record_hit(self, tier: str):
+        """Count a lookup answered by the "local" or "shared" tier."""
+        with self._lock:
+            if tier == "shared":
+                self.shared_hits += 1
+            else:
+                self.hits += 1
+
+    def get_stale(self, key: CacheKey) -> Optional[dict]:
+        """The entry for a key even if it has expired, without touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate_corridor(self, origin: str, destination: str) -> int:
+        """
+        Drop this worker's entries for a corridor, whatever their language or
+        model. See publish_corridor_invalidation() for the database and the
+        other workers.
+        """
+        corridor = (normalize_country(origin), normalize_country(destination))
+        with self._lock:
+            stale = [key for key in self._entries if key.corridor == corridor]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self) -> dict:
+        with self._lock:
+            answered = self.hits + self.shared_hits
+            lookups = answered + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": answered / lookups if lookups else 0.0,
+            }
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+response_cache = ResponseCache()
+
+
+def publish_corridor_invalidation(db: Session, origin: str, destination: str):
+    """
+    Record a corridor's invalidation in the caller's transaction and queue a
+    NOTIFY, so every worker drops its cached entries once it commits.
+    """
+    corridor = (normalize_country(origin), normalize_country(destination))
+    db.merge(
+        CorridorInvalidation(
+            origin_country=corridor[0],
+            destination_country=corridor[1],
+            invalidated_at=datetime.utcnow(),
+        )
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": INVALIDATION_CHANNEL, "payload": json.dumps(corridor)},
+        )
+
+
+def on_corridor_invalidated(payload: str):
+    """Apply an invalidation published by another worker to this one's cache."""
+    origin, destination = json.loads(payload)
+    response_cache.invalidate_corridor(origin, destination)
+
+
+def _not_invalidated(key: CacheKey, answered_at):
+    """Filter out answers from before the corridor's last manual invalidation."""
+    return ~exists().where(
+        CorridorInvalidation.origin_country == key.origin,
+        CorridorInvalidation.destination_country == key.destination,
+        CorridorInvalidation.invalidated_at > answered_at,
+    )
+
+
+def _shared_lookup(key: CacheKey):
+    # Only generated answers count: rows recording cache hits would otherwise
+    # keep an answer fresh for as long as it is asked for
+    return (
+        select(TravelDocumentQuery)
+        .where(
+            TravelDocumentQuery.cache_key == key.digest,
+            TravelDocumentQuery.source == "llm",
+            TravelDocumentQuery.queried_at
+            >= datetime.utcnow() - timedelta(seconds=response_cache.ttl_seconds),
+            _not_invalidated(key, TravelDocumentQuery.queried_at),
+        )
+        .order_by(TravelDocumentQuery.queried_at.desc())
+        .limit(1)
+    )
+
+
+async def get_shared_response_async(db: AsyncSession, key: CacheKey) -> Optional[dict]:
+    """Look up a fresh answer for the key in the travel_document_queries table."""
+    query = await db.scalar(_shared_lookup(key))
+    return query.to_response() if query else None
+
+
+async def get_fallback_response_async(
+    db: AsyncSession, key: CacheKey
+) -> Optional[dict]:
+    """
+    Last known answer for a key, however old, for when the LLM is
+    unavailable; like every cache tier it matches the full key, so the
+    answer is in the configured language. Answers older than a manual
+    invalidation are never served.
+    """
+    answer = response_cache.get_stale(key)
+    if answer is not None:
+        return answer
+
+    row = await db.scalar(
+        select(TravelDocumentQuery)
+        .where(
+            TravelDocumentQuery.cache_key == key.digest,
+            _not_invalidated(key, TravelDocumentQuery.queried_at),
+        )
+        .order_by(TravelDocumentQuery.queried_at.desc())
+        .limit(1)
+    )
+    if row is None:
+        return None
+    return {**row.to_response(), "generated_at": row.queried_at.isoformat()}
+
+
+async def get_precomputed_answer(
+    db: AsyncSession, key: CacheKey, max_age_seconds: int
+) -> Optional[dict]:
+    """Return the precomputed answer for a key unless it is too old or invalidated."""
+    row = await db.scalar(
+        select(PrecomputedCorridor).where(
+            PrecomputedCorridor.cache_key == key.digest,
+            PrecomputedCorridor.refreshed_at
+            >= datetime.utcnow() - timedelta(seconds=max_age_seconds),
+            _not_invalidated(key, PrecomputedCorridor.refreshed_at),
+        )
+    )
+    return row.to_response() if row else None
@@ -0,0 +1,85 @@
+# backend/app/cli.py
+"""
+Answer travel document requests from the command line, through the same
+pipeline as the API. Run from backend/:
+
+    python -m app.cli ask Kenya Ireland
+    python -m app.cli ask Kenya Ireland --stream
+    python -m app.cli batch corridors.json
+
+A batch file holds a JSON list of {"origin": ..., "destination": ...}
+objects. Output is NDJSON, one event per line, like the streaming endpoints.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from fastapi import HTTPException
+
+from .config import config_store
+from .gateway import LLMUnavailableError
+from .history import history_writer
+from .pipeline import travel_docs
+from .schemas import TravelDocumentRequest
+from .session import AsyncSessionLocal, SessionLocal
+from .streaming import ndjson_line
+
+
+async def ask(args: argparse.Namespace):
+    request = TravelDocumentRequest(origin=args.origin, destination=args.destination)
+    async with AsyncSessionLocal() as db:
+        if not args.stream:
+            result = await travel_docs.ask(db, request)
+            print(json.dumps({"source": result.source, "result": result.answer}))
+            return
+        async for event in await travel_docs.stream(db, request):
+            sys.stdout.write(ndjson_line(event))
+
+
+async def batch(args: argparse.Namespace):
+    with open(args.file) as f:
+        requests = [TravelDocumentRequest(**item) for item in json.load(f)]
+    async with AsyncSessionLocal() as db:
+        async for event in await travel_docs.batch(db, requests):
+            sys.stdout.write(ndjson_line(event))
+
+
+async def run(args: argparse.Namespace):
+    history_writer.start()
+    try:
+        await args.command(args)
+    finally:
+        # Flush queued history rows before exiting
+        await history_writer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(required=True)
+
+    ask_parser = commands.add_parser("ask", help="answer one origin/destination pair")
+    ask_parser.add_argument("origin")
+    ask_parser.add_argument("destination")
+    ask_parser.add_argument(
+        "--stream", action="store_true", help="print items as they are generated"
+    )
+    ask_parser.set_defaults(command=ask)
+
+    batch_parser = commands.add_parser("batch", help="answer every pair in a JSON file")
+    batch_parser.add_argument("file")
+    batch_parser.set_defaults(command=batch)
+
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        config_store.load(db)
+    try:
+        asyncio.run(run(args))
+    except LLMUnavailableError as e:
+        sys.exit(f"{e} (retry after {e.retry_after}s)")
+    except HTTPException as e:
+        sys.exit(e.detail)
+
+
+if __name__ == "__main__":
+    main()
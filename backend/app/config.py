@@ -0,0 +1,280 @@
+# backend/app/config.py
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, fields
+from typing import Dict, Optional, Tuple
+
+import asyncpg
+from fastapi import HTTPException, status
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from .admission import admission_controller
+from .cache import INVALIDATION_CHANNEL, on_corridor_invalidated, response_cache
+from .gateway import llm_gateway
+from .llm import llm_clients
+from .models import ApplicationConfig
+from .ratelimit import llm_rate_limiter
+from .session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+CONFIG_CHANNEL = "application_config_changed"
+
+# Backoff between attempts to re-open a lost LISTEN connection
+LISTENER_RETRY_SECONDS = 1.0
+LISTENER_RETRY_MAX_SECONDS = 30.0
+
+
+def _as_bool(value: str) -> bool:
+    return value.strip().lower() == "true"
+
+
+def _as_list(value: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+# Parsers for the field types of ConfigSnapshot
+_PARSERS = {str: str, int: int, float: float, bool: _as_bool, Tuple[str, ...]: _as_list}
+
+
+class InvalidConfigValue(ValueError):
+    """A setting's value does not parse as the type of its field."""
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Typed, immutable view of the application_config table."""
+
+    google_api_key: str = ""
+    google_api_keys: Tuple[str, ...] = ()
+    llm_model: str = "gemini-1.5-flash-latest"
+    llm_fallback_models: Tuple[str, ...] = ()
+    llm_slow_call_ms: int = 8000
+    llm_temperature: float = 0.3
+    llm_max_output_tokens: int = 4096
+    enable_history: bool = True
+    default_response_language: str = "English"
+    cache_ttl_seconds: int = 86400
+    cache_max_entries: int = 1000
+    enable_shared_cache: bool = True
+    batch_concurrency: int = 8
+    llm_requests_per_minute: int = 60
+    enable_precompute: bool = False
+    precompute_top_n: int = 50
+    precompute_countries: Tuple[str, ...] = ()
+    precompute_interval_seconds: int = 3600
+    precompute_max_age_seconds: int = 86400
+    history_flush_interval_ms: int = 250
+    history_batch_size: int = 200
+    llm_max_concurrency: int = 16
+    llm_timeout_seconds: float = 30.0
+    llm_max_retries: int = 2
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+    admission_max_active: int = 16
+    admission_queue_capacity: int = 256
+    admission_queue_timeout_seconds: float = 10.0
+    client_requests_per_minute: int = 0
+    version: int = 0
+
+    @classmethod
+    def from_values(
+        cls, values: Dict[str, str], version: int, strict: bool = True
+    ) -> "ConfigSnapshot":
+        """
+        Parse the table's string values by field type; missing keys keep their
+        defaults. A value that does not parse raises InvalidConfigValue, or
+        with strict=False is logged and replaced by its default.
+        """
+        parsed = {}
+        for field in fields(cls):
+            if field.name == "version" or field.name not in values:
+                continue
+            try:
+                parsed[field.name] = _PARSERS[field.type](values[field.name])
+            except ValueError:
+                error = InvalidConfigValue(
+                    f"Invalid value for {field.name}: {values[field.name]!r}"
+                )
+                if strict:
+                    raise error from None
+                logger.error("%s; using the default %r", error, field.default)
+        return cls(**parsed, version=version)
+
+    @property
+    def api_keys(self) -> Tuple[str, ...]:
+        """The primary API key followed by the rest of the key pool, deduplicated."""
+        keys = (self.google_api_key, *self.google_api_keys)
+        return tuple(dict.fromkeys(key for key in keys if key))
+
+    @property
+    def models(self) -> Tuple[str, ...]:
+        """The primary model followed by its fallbacks, in order of preference."""
+        return tuple(dict.fromkeys((self.llm_model, *self.llm_fallback_models)))
+
+    def require_google_api_key(self) -> str:
+        if not self.api_keys:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Google API key is not configured. Please set it in the application settings.",
+            )
+        return self.api_keys[0]
+
+
+class ConfigStore:
+    """
+    Process-wide config snapshot, loaded at startup and swapped atomically.
+
+    Writers reload their own snapshot and NOTIFY on CONFIG_CHANNEL; every other
+    worker LISTENs on that channel and reloads in the background, so the
+    request path never queries application_config. The same connection
+    relays corridor invalidations (INVALIDATION_CHANNEL) to the answer cache,
+    and is re-opened if it drops.
+    """
+
+    def __init__(self):
+        self._snapshot = ConfigSnapshot()
+        self._lock = threading.Lock()
+        self._listener: Optional[asyncpg.Connection] = None
+        self._reload: Optional[asyncio.Task] = None
+        self._reconnect: Optional[asyncio.Task] = None
+
+    def get(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    def load(self, db: Session) -> ConfigSnapshot:
+        """
+        Load the table. Used at startup and after this worker's own writes,
+        which validate() first, so a bad value falls back to its default
+        rather than keeping the service from starting.
+        """
+        rows = db.query(ApplicationConfig.config_key, ApplicationConfig.config_value)
+        return self._apply({key: value for key, value in rows}, strict=False)
+
+    async def load_async(self) -> ConfigSnapshot:
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(ApplicationConfig.config_key, ApplicationConfig.config_value)
+            )
+            return self._apply({key: value for key, value in rows})
+
+    def validate(self, db: Session) -> ConfigSnapshot:
+        """
+        Parse the table as the session sees it, pending changes included,
+        without applying it. Raises InvalidConfigValue for a bad value, so
+        writers can reject it before committing.
+        """
+        db.flush()
+        rows = db.query(ApplicationConfig.config_key, ApplicationConfig.config_value)
+        return ConfigSnapshot.from_values({key: value for key, value in rows}, 0)
+
+    def _apply(self, values: Dict[str, str], strict: bool = True) -> ConfigSnapshot:
+        with self._lock:
+            previous = self._snapshot
+            snapshot = ConfigSnapshot.from_values(values, previous.version + 1, strict)
+            if (
+                previous.api_keys,
+                previous.models,
+                previous.llm_temperature,
+                previous.llm_max_output_tokens,
+            ) != (
+                snapshot.api_keys,
+                snapshot.models,
+                snapshot.llm_temperature,
+                snapshot.llm_max_output_tokens,
+            ):
+                # Drop clients built for settings that no longer apply
+                llm_clients.clear()
+            response_cache.configure(
+                max_entries=snapshot.cache_max_entries,
+                ttl_seconds=snapshot.cache_ttl_seconds,
+            )
+            llm_rate_limiter.configure(snapshot.llm_requests_per_minute)
+            llm_gateway.configure(
+                max_concurrency=snapshot.llm_max_concurrency,
+                timeout_seconds=snapshot.llm_timeout_seconds,
+                max_retries=snapshot.llm_max_retries,
+                failure_threshold=snapshot.circuit_failure_threshold,
+                reset_seconds=snapshot.circuit_reset_seconds,
+                api_keys=snapshot.api_keys,
+                models=snapshot.models,
+                slow_call_ms=snapshot.llm_slow_call_ms,
+            )
+            admission_controller.configure(
+                max_active=snapshot.admission_max_active,
+                queue_capacity=snapshot.admission_queue_capacity,
+                queue_timeout_seconds=snapshot.admission_queue_timeout_seconds,
+                client_requests_per_minute=snapshot.client_requests_per_minute,
+            )
+            self._snapshot = snapshot
+            return snapshot
+
+    async def start_listener(self):
+        if async_engine.url.get_backend_name() != "postgresql":
+            return  # LISTEN/NOTIFY is Postgres-only; other databases run one worker
+        if not await self._connect_listener():
+            self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_listener())
+
+    async def stop_listener(self):
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            listener.remove_termination_listener(self._on_terminated)
+            await listener.close()
+
+    async def _connect_listener(self) -> bool:
+        dsn = async_engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        try:
+            listener = await asyncpg.connect(dsn)
+            await listener.add_listener(CONFIG_CHANNEL, self._on_notify)
+            await listener.add_listener(
+                INVALIDATION_CHANNEL,
+                lambda connection, pid, channel, payload: on_corridor_invalidated(payload),
+            )
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning("Config change listener unavailable: %s", e)
+            return False
+        listener.add_termination_listener(self._on_terminated)
+        self._listener = listener
+        return True
+
+    def _on_terminated(self, connection):
+        logger.warning("Config change listener lost its connection; reconnecting")
+        self._listener = None
+        self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self):
+        delay = LISTENER_RETRY_SECONDS
+        while not await self._connect_listener():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_RETRY_MAX_SECONDS)
+        # Notifications sent while disconnected are lost: catch up on both
+        response_cache.clear()
+        await self._reload_config()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._reload = asyncio.get_running_loop().create_task(self._reload_config())
+
+    async def _reload_config(self):
+        try:
+            await self.load_async()
+        except Exception:
+            logger.exception(
+                "Config reload failed; keeping config version %d", self._snapshot.version
+            )
+
+
+config_store = ConfigStore()
+
+
+def publish_config_change(db: Session):
+    """Queue a NOTIFY that other workers receive when the transaction commits."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CONFIG_CHANNEL})
@@ -0,0 +1,337 @@
+# backend/app/countries.py
+import difflib
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# ISO 3166-1 alpha-2 codes and short English names
+ISO_COUNTRIES = {
+    "AD": "Andorra",
+    "AE": "United Arab Emirates",
+    "AF": "Afghanistan",
+    "AG": "Antigua and Barbuda",
+    "AL": "Albania",
+    "AM": "Armenia",
+    "AO": "Angola",
+    "AR": "Argentina",
+    "AT": "Austria",
+    "AU": "Australia",
+    "AZ": "Azerbaijan",
+    "BA": "Bosnia and Herzegovina",
+    "BB": "Barbados",
+    "BD": "Bangladesh",
+    "BE": "Belgium",
+    "BF": "Burkina Faso",
+    "BG": "Bulgaria",
+    "BH": "Bahrain",
+    "BI": "Burundi",
+    "BJ": "Benin",
+    "BN": "Brunei",
+    "BO": "Bolivia",
+    "BR": "Brazil",
+    "BS": "Bahamas",
+    "BT": "Bhutan",
+    "BW": "Botswana",
+    "BY": "Belarus",
+    "BZ": "Belize",
+    "CA": "Canada",
+    "CD": "Democratic Republic of the Congo",
+    "CF": "Central African Republic",
+    "CG": "Republic of the Congo",
+    "CH": "Switzerland",
+    "CI": "Côte d'Ivoire",
+    "CL": "Chile",
+    "CM": "Cameroon",
+    "CN": "China",
+    "CO": "Colombia",
+    "CR": "Costa Rica",
+    "CU": "Cuba",
+    "CV": "Cabo Verde",
+    "CY": "Cyprus",
+    "CZ": "Czechia",
+    "DE": "Germany",
+    "DJ": "Djibouti",
+    "DK": "Denmark",
+    "DM": "Dominica",
+    "DO": "Dominican Republic",
+    "DZ": "Algeria",
+    "EC": "Ecuador",
+    "EE": "Estonia",
+    "EG": "Egypt",
+    "ER": "Eritrea",
+    "ES": "Spain",
+    "ET": "Ethiopia",
+    "FI": "Finland",
+    "FJ": "Fiji",
+    "FM": "Micronesia",
+    "FR": "France",
+    "GA": "Gabon",
+    "GB": "United Kingdom",
+    "GD": "Grenada",
+    "GE": "Georgia",
+    "GH": "Ghana",
+    "GM": "Gambia",
+    "GN": "Guinea",
+    "GQ": "Equatorial Guinea",
+    "GR": "Greece",
+    "GT": "Guatemala",
+    "GW": "Guinea-Bissau",
+    "GY": "Guyana",
+    "HK": "Hong Kong",
+    "HN": "Honduras",
+    "HR": "Croatia",
+    "HT": "Haiti",
+    "HU": "Hungary",
+    "ID": "Indonesia",
+    "IE": "Ireland",
+    "IL": "Israel",
+    "IN": "India",
+    "IQ": "Iraq",
+    "IR": "Iran",
+    "IS": "Iceland",
+    "IT": "Italy",
+    "JM": "Jamaica",
+    "JO": "Jordan",
+    "JP": "Japan",
+    "KE": "Kenya",
+    "KG": "Kyrgyzstan",
+    "KH": "Cambodia",
+    "KI": "Kiribati",
+    "KM": "Comoros",
+    "KN": "Saint Kitts and Nevis",
+    "KP": "North Korea",
+    "KR": "South Korea",
+    "KW": "Kuwait",
+    "KZ": "Kazakhstan",
+    "LA": "Laos",
+    "LB": "Lebanon",
+    "LC": "Saint Lucia",
+    "LI": "Liechtenstein",
+    "LK": "Sri Lanka",
+    "LR": "Liberia",
+    "LS": "Lesotho",
+    "LT": "Lithuania",
+    "LU": "Luxembourg",
+    "LV": "Latvia",
+    "LY": "Libya",
+    "MA": "Morocco",
+    "MC": "Monaco",
+    "MD": "Moldova",
+    "ME": "Montenegro",
+    "MG": "Madagascar",
+    "MH": "Marshall Islands",
+    "MK": "North Macedonia",
+    "ML": "Mali",
+    "MM": "Myanmar",
+    "MN": "Mongolia",
+    "MO": "Macao",
+    "MR": "Mauritania",
+    "MT": "Malta",
+    "MU": "Mauritius",
+    "MV": "Maldives",
+    "MW": "Malawi",
+    "MX": "Mexico",
+    "MY": "Malaysia",
+    "MZ": "Mozambique",
+    "NA": "Namibia",
+    "NE": "Niger",
+    "NG": "Nigeria",
+    "NI": "Nicaragua",
+    "NL": "Netherlands",
+    "NO": "Norway",
+    "NP": "Nepal",
+    "NR": "Nauru",
+    "NZ": "New Zealand",
+    "OM": "Oman",
+    "PA": "Panama",
+    "PE": "Peru",
+    "PG": "Papua New Guinea",
+    "PH": "Philippines",
+    "PK": "Pakistan",
+    "PL": "Poland",
+    "PS": "Palestine",
+    "PT": "Portugal",
+    "PW": "Palau",
+    "PY": "Paraguay",
+    "QA": "Qatar",
+    "RO": "Romania",
+    "RS": "Serbia",
+    "RU": "Russia",
+    "RW": "Rwanda",
+    "SA": "Saudi Arabia",
+    "SB": "Solomon Islands",
+    "SC": "Seychelles",
+    "SD": "Sudan",
+    "SE": "Sweden",
+    "SG": "Singapore",
+    "SI": "Slovenia",
+    "SK": "Slovakia",
+    "SL": "Sierra Leone",
+    "SM": "San Marino",
+    "SN": "Senegal",
+    "SO": "Somalia",
+    "SR": "Suriname",
+    "SS": "South Sudan",
+    "ST": "Sao Tome and Principe",
+    "SV": "El Salvador",
+    "SY": "Syria",
+    "SZ": "Eswatini",
+    "TD": "Chad",
+    "TG": "Togo",
+    "TH": "Thailand",
+    "TJ": "Tajikistan",
+    "TL": "Timor-Leste",
+    "TM": "Turkmenistan",
+    "TN": "Tunisia",
+    "TO": "Tonga",
+    "TR": "Turkey",
+    "TT": "Trinidad and Tobago",
+    "TV": "Tuvalu",
+    "TW": "Taiwan",
+    "TZ": "Tanzania",
+    "UA": "Ukraine",
+    "UG": "Uganda",
+    "US": "United States",
+    "UY": "Uruguay",
+    "UZ": "Uzbekistan",
+    "VA": "Vatican City",
+    "VC": "Saint Vincent and the Grenadines",
+    "VE": "Venezuela",
+    "VN": "Vietnam",
+    "VU": "Vanuatu",
+    "WS": "Samoa",
+    "YE": "Yemen",
+    "ZA": "South Africa",
+    "ZM": "Zambia",
+    "ZW": "Zimbabwe",
+}
+
+# Common alternative names, keyed to the ISO code they refer to
+COUNTRY_ALIASES = {
+    "UK": "GB",
+    "Great Britain": "GB",
+    "Britain": "GB",
+    "England": "GB",
+    "Scotland": "GB",
+    "Wales": "GB",
+    "Northern Ireland": "GB",
+    "United Kingdom of Great Britain and Northern Ireland": "GB",
+    "USA": "US",
+    "U.S.": "US",
+    "U.S.A.": "US",
+    "America": "US",
+    "United States of America": "US",
+    "UAE": "AE",
+    "Emirates": "AE",
+    "Dubai": "AE",
+    "Holland": "NL",
+    "The Netherlands": "NL",
+    "Czech Republic": "CZ",
+    "Ivory Coast": "CI",
+    "Cote d'Ivoire": "CI",
+    "Cape Verde": "CV",
+    "Swaziland": "SZ",
+    "Burma": "MM",
+    "East Timor": "TL",
+    "Macedonia": "MK",
+    "Republic of Korea": "KR",
+    "Korea": "KR",
+    "DPRK": "KP",
+    "Russian Federation": "RU",
+    "Türkiye": "TR",
+    "Turkiye": "TR",
+    "Viet Nam": "VN",
+    "Lao PDR": "LA",
+    "Persia": "IR",
+    "Syrian Arab Republic": "SY",
+    "DRC": "CD",
+    "DR Congo": "CD",
+    "Congo-Kinshasa": "CD",
+    "Congo-Brazzaville": "CG",
+    "The Gambia": "GM",
+    "The Bahamas": "BS",
+    "Vatican": "VA",
+    "Holy See": "VA",
+    "Brunei Darussalam": "BN",
+    "Republic of Ireland": "IE",
+    "Eire": "IE",
+    "Deutschland": "DE",
+    "España": "ES",
+    "Espana": "ES",
+    "Nippon": "JP",
+    "Mainland China": "CN",
+    "People's Republic of China": "CN",
+    "PRC": "CN",
+    "Sao Tome": "ST",
+    "São Tomé and Príncipe": "ST",
+    "Micronesia (Federated States of)": "FM",
+    "Trinidad": "TT",
+    "Bosnia": "BA",
+    "Saint Kitts": "KN",
+    "St Kitts and Nevis": "KN",
+    "St Lucia": "LC",
+    "St Vincent": "VC",
+    "Aotearoa": "NZ",
+}
+
+# Fuzzy matches must be at least this similar (difflib ratio) to be trusted,
+# and beat the closest other country by FUZZY_MARGIN: "Austrai" is about as
+# close to Austria as to Australia, so it is left unresolved, not guessed
+FUZZY_CUTOFF = 0.85
+FUZZY_MARGIN = 0.12
+
+
+def _fold(name: str) -> str:
+    return " ".join(name.replace(".", " ").split()).casefold()
+
+
+def _build_lookup() -> Dict[str, str]:
+    lookup = {}
+    for code, name in ISO_COUNTRIES.items():
+        lookup[_fold(name)] = name
+        lookup[code.casefold()] = name
+    for alias, code in COUNTRY_ALIASES.items():
+        lookup[_fold(alias)] = ISO_COUNTRIES[code]
+    return lookup
+
+
+_LOOKUP = _build_lookup()
+_LOOKUP_KEYS = list(_LOOKUP)
+
+
+def _strip_article(folded: str) -> str:
+    if folded.startswith("the ") and folded not in _LOOKUP:
+        return folded[4:]
+    return folded
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy_candidates(folded: str) -> List[Tuple[str, float]]:
+    """Countries whose names come within FUZZY_MARGIN of the cutoff, closest first."""
+    scores: Dict[str, float] = {}
+    for key in difflib.get_close_matches(
+        folded, _LOOKUP_KEYS, n=10, cutoff=FUZZY_CUTOFF - FUZZY_MARGIN
+    ):
+        country = _LOOKUP[key]
+        ratio = difflib.SequenceMatcher(None, folded, key).ratio()
+        scores[country] = max(scores.get(country, 0.0), ratio)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+@lru_cache(maxsize=4096)
+def resolve_country(name: str) -> Optional[str]:
+    """
+    Canonical ISO 3166 short name for a country name, alias, ISO alpha-2 code
+    or unambiguous misspelling, or None when nothing matches confidently.
+    """
+    folded = _strip_article(_fold(name))
+    if folded in _LOOKUP:
+        return _LOOKUP[folded]
+    # Short inputs are too ambiguous to fuzzy-match (e.g. "Mali" vs "Malta")
+    if len(folded) < 5:
+        return None
+    candidates = _fuzzy_candidates(folded)
+    if not candidates or candidates[0][1] < FUZZY_CUTOFF:
+        return None
+    if len(candidates) > 1 and candidates[0][1] - candidates[1][1] < FUZZY_MARGIN:
+        return None
+    return candidates[0][0]
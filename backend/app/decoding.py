@@ -0,0 +1,179 @@
+# backend/app/decoding.py
+import json
+from typing import List, Tuple
+
+from .schemas import TravelDocumentResponse
+
+# The answer sections every LLM response must contain, in schema order
+ANSWER_FIELDS: Tuple[str, ...] = tuple(
+    name
+    for name, field in TravelDocumentResponse.model_fields.items()
+    if field.is_required()
+)
+
+# Gemini response schema (OpenAPI subset) derived from TravelDocumentResponse
+ANSWER_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        name: {
+            "type": "ARRAY",
+            "items": {"type": "STRING"},
+            "description": TravelDocumentResponse.model_fields[name].description,
+        }
+        for name in ANSWER_FIELDS
+    },
+    "required": list(ANSWER_FIELDS),
+}
+
+JSON_MIME_TYPE = "application/json"
+
+# Keys models sometimes use instead of the schema's own
+FIELD_ALIASES = {
+    "travel_advisories": "advisories",
+    "visa_requirements": "visa_documents",
+    "passport": "passport_requirements",
+    "other_documents": "additional_documents",
+}
+
+_CLOSERS = {"{": "}", "[": "]"}
+_SMART_QUOTES = "“”"
+
+
+class AnswerDecodeError(ValueError):
+    """The LLM output could not be turned into a valid answer."""
+
+
+def extract_json_object(text: str) -> str:
+    """
+    Return the first top-level JSON object embedded in `text`, skipping any
+    markdown fences or prose around it. An object that never closes (a
+    truncated response) is returned up to the end of the text.
+    """
+    start = text.find("{")
+    if start < 0:
+        raise AnswerDecodeError("No JSON object in response")
+
+    depth = 0
+    in_string = escape = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start : i + 1]
+    return text[start:]
+
+
+def repair_json(text: str) -> str:
+    """
+    Fix the defects LLMs commonly produce in otherwise valid JSON: curly
+    quotes used as string delimiters, raw newlines inside strings, trailing
+    commas, and strings or brackets left open by a truncated response. Curly
+    quotes inside string values are text and are kept as they are.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    closers = '"'
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch in closers:
+                ch = '"'
+                in_string = False
+            elif ch == "\n":
+                ch = "\\n"
+            elif ch in "\r\t":
+                ch = " "
+        elif ch == '"' or ch in _SMART_QUOTES:
+            # A string opened with a curly quote may be closed by either kind
+            closers = '"' if ch == '"' else '"”'
+            ch = '"'
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            _strip_dangling(out, ",")
+            if stack:
+                stack.pop()
+        out.append(ch)
+
+    if in_string:
+        out.append('"')
+    _strip_dangling(out, ",:")
+    while stack:
+        out.append(_CLOSERS[stack.pop()])
+    return "".join(out)
+
+
+def _strip_dangling(out: List[str], chars: str):
+    """Drop trailing whitespace and any of `chars` from the end of `out`."""
+    while out and (out[-1].isspace() or out[-1] in chars):
+        out.pop()
+
+
+def _item_text(item) -> str:
+    """
+    Text of one section item. Models sometimes answer with objects such as
+    {"document": "Visa", "note": "on arrival"}; those read as their values,
+    "Visa - on arrival", not as a Python repr. Nested lists read the same way.
+    """
+    if isinstance(item, dict):
+        item = list(item.values())
+    if isinstance(item, list):
+        return " - ".join(text for text in map(_item_text, item) if text)
+    if item is None:
+        return ""
+    return str(item).strip()
+
+
+def normalize_answer(data) -> dict:
+    """Validate a parsed answer and coerce every section to a list of strings."""
+    if not isinstance(data, dict):
+        raise AnswerDecodeError("Response is not a JSON object")
+
+    for alias, field in FIELD_ALIASES.items():
+        if alias in data and field not in data:
+            data[field] = data.pop(alias)
+
+    missing = [field for field in ANSWER_FIELDS if field not in data]
+    if missing:
+        raise AnswerDecodeError(f"Missing required fields in response: {', '.join(missing)}")
+
+    result = {}
+    for field in ANSWER_FIELDS:
+        value = data[field]
+        if not isinstance(value, list):
+            value = [value]
+        result[field] = [text for text in map(_item_text, value) if text]
+    return result
+
+
+def decode_answer(text: str) -> dict:
+    """
+    Decode an LLM answer without another model call: parse the embedded JSON
+    object as-is, then again after local repair.
+    """
+    candidate = extract_json_object(text)
+    try:
+        return normalize_answer(json.loads(candidate))
+    except json.JSONDecodeError:
+        pass
+    try:
+        return normalize_answer(json.loads(repair_json(candidate)))
+    except json.JSONDecodeError as e:
+        raise AnswerDecodeError(f"Invalid JSON: {e}") from e
@@ -0,0 +1,176 @@
+# backend/app/export.py
+import csv
+import io
+from typing import Iterator, List, Sequence
+
+import orjson
+from sqlalchemy import select
+
+from .models import TravelAnswer, TravelDocumentQuery
+from .session import ReadSessionLocal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - Parquet export is an optional extra
+    pa = pq = None
+
+# Rows fetched per round trip from the server-side cursor; one Parquet row group
+EXPORT_CHUNK_ROWS = 5000
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+SCALAR_COLUMNS = (
+    "id",
+    "origin_country",
+    "destination_country",
+    "queried_at",
+    "answer_hash",
+)
+# Export column -> answer body field
+DOCUMENT_COLUMNS = {
+    "visa_documents": "visa_documents",
+    "passport_requirements": "passport_requirements",
+    "additional_documents": "additional_documents",
+    "travel_advisories": "advisories",
+}
+EXPORT_COLUMNS = SCALAR_COLUMNS + tuple(DOCUMENT_COLUMNS)
+
+
+def _history_rows(filters: Sequence) -> Iterator[List[tuple]]:
+    """
+    Yield history rows in chunks of EXPORT_CHUNK_ROWS, oldest first, from a
+    server-side cursor: plain tuples, never ORM objects, and never more
+    than one chunk in memory.
+    """
+    query = (
+        select(
+            *(getattr(TravelDocumentQuery, column) for column in SCALAR_COLUMNS),
+            TravelAnswer.body,
+        )
+        .join(TravelAnswer, TravelAnswer.answer_hash == TravelDocumentQuery.answer_hash)
+        .where(*filters)
+        .order_by(TravelDocumentQuery.queried_at, TravelDocumentQuery.id)
+        .execution_options(stream_results=True, yield_per=EXPORT_CHUNK_ROWS)
+    )
+    # A session of its own: it must outlive the request handler while the
+    # response streams
+    with ReadSessionLocal() as db:
+        for partition in db.execute(query).partitions():
+            yield [
+                (*scalars, *(body[field] for field in DOCUMENT_COLUMNS.values()))
+                for *scalars, body in partition
+            ]
+
+
+def _ndjson(filters: Sequence) -> Iterator[bytes]:
+    for chunk in _history_rows(filters):
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_COLUMNS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in chunk
+        )
+
+
+def _csv(filters: Sequence) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    scalars = len(SCALAR_COLUMNS)
+    for chunk in _history_rows(filters):
+        # Document lists go into their cells as JSON arrays
+        writer.writerows(
+            (
+                *row[:scalars],
+                *(orjson.dumps(items).decode() for items in row[scalars:]),
+            )
+            for row in chunk
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink:
+    """
+    Write-only file for ParquetWriter that hands out the bytes written since
+    the last drain while still reporting absolute positions, which the
+    Parquet footer records as row group offsets.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    documents = pa.list_(pa.string())
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("origin_country", pa.string()),
+            ("destination_country", pa.string()),
+            ("queried_at", pa.timestamp("us")),
+            ("answer_hash", pa.string()),
+            *((column, documents) for column in DOCUMENT_COLUMNS),
+        ]
+    )
+
+
+def _parquet(filters: Sequence) -> Iterator[bytes]:
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for chunk in _history_rows(filters):
+            columns = list(zip(*chunk))
+            columns[0] = [str(query_id) for query_id in columns[0]]
+            # Each chunk becomes one row group, flushed straight to the client
+            writer.write_table(
+                pa.Table.from_pydict(dict(zip(schema.names, columns)), schema=schema)
+            )
+            yield sink.drain()
+    yield sink.drain()
+
+
+EXPORTERS = {"ndjson": _ndjson, "csv": _csv, "parquet": _parquet}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def export_history(export_format: str, filters: Sequence) -> Iterator[bytes]:
+    """Encode the history rows matching `filters` as a stream of byte chunks."""
+    return EXPORTERS[export_format](filters)
@@ -0,0 +1,343 @@
+# backend/app/gateway.py
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from google.api_core import exceptions as google_exceptions
+
+from .ratelimit import llm_rate_limiter
+from .routing import Route, llm_router
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upstream errors worth retrying; anything else is returned to the caller as-is
+THROTTLED_ERRORS = (google_exceptions.TooManyRequests, google_exceptions.ResourceExhausted)
+TRANSIENT_ERRORS = THROTTLED_ERRORS + (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+# Errors that mean the API key itself was refused (revoked, invalid or
+# lacking access); they say nothing about the model
+KEY_ERRORS = (google_exceptions.PermissionDenied, google_exceptions.Unauthenticated)
+
+
+def is_key_error(error: BaseException) -> bool:
+    # An invalid key is reported as a 400 rather than a 401
+    return isinstance(error, KEY_ERRORS) or (
+        isinstance(error, google_exceptions.InvalidArgument) and "API key" in str(error)
+    )
+
+
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+
+
+class LLMUnavailableError(Exception):
+    """The LLM could not be reached; retry after `retry_after` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive upstream failures and rejects
+    calls for `reset_seconds`; then lets a single probe through (half-open)
+    and closes again once it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 0
+        remaining = self.reset_seconds - (time.monotonic() - self.opened_at)
+        return max(1, int(remaining + 0.999))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Let another probe through after one ended without a verdict."""
+        self._probing = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._probing or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                logger.warning(
+                    "LLM circuit opened after %d consecutive failures",
+                    self.consecutive_failures,
+                )
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+
+class LLMGateway:
+    """
+    Single choke point for every Gemini call.
+
+    Calls pass the circuit breaker, then wait for a global concurrency slot
+    and a token from the adaptive per-key rate limiter. Transient failures
+    (429, 5xx, timeouts) are retried with full-jitter exponential backoff;
+    a call that exhausts its retries counts as one breaker failure and
+    surfaces as LLMUnavailableError.
+    """
+
+    def __init__(self):
+        self.max_concurrency = 16
+        self.timeout_seconds = 30.0
+        self.max_retries = 2
+        self.api_keys: Tuple[str, ...] = ()
+        self.models: Tuple[str, ...] = ()
+        self.slow_call_ms = 8000.0
+        self.breaker = CircuitBreaker()
+        self.in_flight = 0
+        self._slots = asyncio.Condition()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.rejected = 0
+        self.fallbacks = 0
+
+    def configure(
+        self,
+        max_concurrency: int,
+        timeout_seconds: float,
+        max_retries: int,
+        failure_threshold: int,
+        reset_seconds: float,
+        api_keys: Sequence[str] = (),
+        models: Sequence[str] = (),
+        slow_call_ms: float = 8000,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout_seconds = max(1.0, timeout_seconds)
+        self.max_retries = max(0, max_retries)
+        self.breaker.failure_threshold = max(1, failure_threshold)
+        self.breaker.reset_seconds = max(1.0, reset_seconds)
+        self.api_keys = tuple(api_keys)
+        self.models = tuple(models)
+        self.slow_call_ms = slow_call_ms
+        llm_router.retain(self.api_keys, self.models)
+
+    def unavailable(self) -> LLMUnavailableError:
+        return LLMUnavailableError(
+            "The LLM service is temporarily unavailable", self.breaker.retry_after()
+        )
+
+    def fail_fast(self):
+        """
+        Raise while the circuit is open, before a caller queues for a call
+        that would be rejected anyway. Unlike the breaker check in call(), it
+        never takes the half-open probe.
+        """
+        if self.breaker.state == "open":
+            self.rejected += 1
+            raise self.unavailable()
+
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise self.unavailable()
+
+    @asynccontextmanager
+    async def _slot(self):
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.in_flight < self.max_concurrency)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._slots:
+                self.in_flight -= 1
+                self._slots.notify()
+
+    def _route(self) -> Route:
+        if not self.api_keys or not self.models:
+            raise RuntimeError("LLM gateway has no API keys or models configured")
+        return llm_router.choose(self.api_keys, self.models, self.slow_call_ms)
+
+    def _finish(self, route: Route, started: float, error: Optional[BaseException] = None):
+        throttled = isinstance(error, THROTTLED_ERRORS)
+        if throttled:
+            self.throttled += 1
+            llm_rate_limiter.record_throttled(route.api_key)
+        elif isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        elif error is None:
+            llm_rate_limiter.record_success(route.api_key)
+        llm_router.finished(
+            route,
+            (time.monotonic() - started) * 1000,
+            failed=error is not None,
+            throttled=throttled,
+            slow_call_ms=self.slow_call_ms,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+
+    async def call(self, fn: Callable[[Route], Awaitable[T]]) -> T:
+        """
+        Run `fn`, one upstream request over the given key and model, through
+        the gateway. Every attempt picks a fresh route, so a retry after a 429
+        or a timeout lands on another key or a fallback model.
+        """
+        self._check_breaker()
+        attempt = 0
+        while True:
+            self.calls += 1
+            try:
+                async with self._slot():
+                    route = self._route()
+                    await llm_rate_limiter.acquire(route.api_key)
+                    started = time.monotonic()
+                    llm_router.started(route)
+                    try:
+                        result = await asyncio.wait_for(fn(route), self.timeout_seconds)
+                    except TRANSIENT_ERRORS as e:
+                        self._finish(route, started, e)
+                        raise
+                    except asyncio.CancelledError:
+                        llm_router.abandoned(route)
+                        raise
+                    except BaseException as e:
+                        llm_router.finished(route, 0, failed=True, key_rejected=is_key_error(e))
+                        raise
+                    self._finish(route, started)
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    self.breaker.record_failure()
+                    raise LLMUnavailableError(
+                        f"LLM request failed after {attempt + 1} attempts: {e!r}",
+                        self.breaker.retry_after() or 1,
+                    ) from e
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    @asynccontextmanager
+    async def stream(self) -> AsyncIterator[Route]:
+        """
+        Hold a gateway slot and a route for the lifetime of a streamed
+        response, read through chunks(). Streams cannot be replayed once
+        output has been sent, so they are not retried: a transient failure,
+        a stalled stream included, surfaces as LLMUnavailableError.
+        """
+        self._check_breaker()
+        self.calls += 1
+        async with self._slot():
+            route = self._route()
+            await llm_rate_limiter.acquire(route.api_key)
+            started = time.monotonic()
+            llm_router.started(route)
+            try:
+                yield route
+            except TRANSIENT_ERRORS as e:
+                self._finish(route, started, e)
+                self.failures += 1
+                self.breaker.record_failure()
+                raise LLMUnavailableError(
+                    f"LLM stream failed: {e!r}", self.breaker.retry_after() or 1
+                ) from e
+            except (asyncio.CancelledError, GeneratorExit):
+                llm_router.abandoned(route)
+                self.breaker.release_probe()
+                raise
+            except BaseException as e:
+                llm_router.finished(route, 0, failed=True, key_rejected=is_key_error(e))
+                self.breaker.release_probe()
+                raise
+            self._finish(route, started)
+        self.breaker.record_success()
+
+    async def wait(self, upstream: Awaitable[T]) -> T:
+        """Await one step of a stream, failing after timeout_seconds."""
+        return await asyncio.wait_for(upstream, self.timeout_seconds)
+
+    async def chunks(self, upstream: AsyncIterable[T]) -> AsyncIterator[T]:
+        """
+        Yield the chunks of a stream opened under stream(), failing when none
+        arrives within timeout_seconds. The timeout is per chunk: a stream
+        that keeps producing is bounded by the output token limit instead.
+        """
+        iterator = upstream.__aiter__()
+        while True:
+            try:
+                chunk = await self.wait(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield chunk
+
+    def stats(self) -> dict:
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_after_seconds": self.breaker.retry_after(),
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+            "rate_limits": llm_rate_limiter.stats(),
+            **llm_router.stats(),
+        }
+
+
+llm_gateway = LLMGateway()
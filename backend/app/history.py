@@ -0,0 +1,131 @@
+# backend/app/history.py
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from .analytics import update_rollups
+from .answers import answer_hash, store_answers
+from .config import config_store
+from .models import TravelDocumentQuery
+from .session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+HISTORY_QUEUE_CAPACITY = 10000
+
+
+class HistoryWriter:
+    """
+    Write-behind sink for travel_document_queries rows.
+
+    Submitted values carry the full answer under "answer"; on flush each
+    distinct answer body is stored once in travel_answers and the history row
+    only references it by hash. The corridor rollups behind /api/stats are
+    updated in the same transaction.
+
+    Requests enqueue row values and return immediately; a background task
+    drains the bounded queue and bulk-inserts every history_flush_interval_ms
+    or history_batch_size rows, whichever comes first. When the queue is full
+    new rows are dropped and counted rather than slowing requests down.
+    """
+
+    def __init__(self, capacity: int = HISTORY_QUEUE_CAPACITY):
+        self.capacity = capacity
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_queue_depth = 0
+
+    def submit(self, values: dict) -> bool:
+        try:
+            self._queue.put_nowait(values)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("History queue full; dropping row")
+            return False
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    def start(self):
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and flush everything still queued."""
+        self._stopping = True
+        if self._task is not None:
+            # The loop exits after its current flush interval; nothing in flight is lost
+            await self._task
+            self._task = None
+        while not self._queue.empty():
+            await self._flush(self._drain(self._queue.qsize()))
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.capacity,
+            "max_queue_depth": self.max_queue_depth,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+    async def _run(self):
+        while not self._stopping:
+            config = config_store.get()
+            interval = max(10, config.history_flush_interval_ms) / 1000
+            deadline = time.monotonic() + interval
+            batch = []
+            while len(batch) < max(1, config.history_batch_size):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if batch:
+                await self._flush(batch)
+
+    def _drain(self, count: int) -> List[dict]:
+        return [self._queue.get_nowait() for _ in range(count)]
+
+    async def _flush(self, batch: List[dict]):
+        started = time.perf_counter()
+        bodies: Dict[str, dict] = {}
+        rows = []
+        for values in batch:
+            row = dict(values)
+            body = row.pop("answer")
+            row["answer_hash"] = key = answer_hash(body)
+            bodies[key] = body
+            rows.append(row)
+        try:
+            async with AsyncSessionLocal() as db:
+                await store_answers(db, bodies)
+                await db.execute(insert(TravelDocumentQuery), rows)
+                await update_rollups(db, rows)
+                await db.commit()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to write %d history rows", len(batch))
+            return
+        self.written += len(batch)
+        self.batches += 1
+        self.last_batch_size = len(batch)
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+
+history_writer = HistoryWriter()
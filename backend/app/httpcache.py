@@ -0,0 +1,110 @@
+# backend/app/httpcache.py
+import hashlib
+import os
+from functools import lru_cache
+from typing import Any, Optional
+
+import orjson
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - Brotli is an optional extra
+    BrotliMiddleware = None
+
+# Responses smaller than this are sent uncompressed
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1000"))
+
+# Lists change whenever history or settings do: always revalidate
+REVALIDATE = "no-cache"
+# Settings carry (masked) secrets and must not sit in shared caches
+PRIVATE_REVALIDATE = "private, no-cache"
+# A history row never changes once written
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given parts (a rendered body or version markers)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the client's If-None-Match already names this representation."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def conditional_json(
+    request: Request,
+    content: Any,
+    schema: Any,
+    cache_control: str,
+    etag: Optional[str] = None,
+    headers: Optional[dict] = None,
+) -> Response:
+    """
+    Serialize `content` as `schema` with orjson and answer 304 when the
+    client's copy is current. Without a precomputed (version-based) `etag`,
+    the ETag is a hash of the rendered body.
+    """
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    # Validate ORM rows into the schema as FastAPI would, then let orjson encode
+    # the UUIDs and datetimes of the python dump natively
+    adapter = _adapter(schema)
+    body = orjson.dumps(adapter.dump_python(adapter.validate_python(content)))
+    if etag is None:
+        etag = make_etag(body)
+        if etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+    return Response(
+        body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control, **(headers or {})},
+    )
+
+
+class ReadCompressionMiddleware:
+    """
+    Brotli (or, without brotli-asgi, GZip) for GET responses above
+    COMPRESSION_MINIMUM_SIZE. POST responses pass through untouched so the
+    NDJSON ask streams are never held back in a compressor's buffer.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        if BrotliMiddleware is not None:
+            self.compressed = BrotliMiddleware(
+                app, minimum_size=minimum_size, gzip_fallback=True
+            )
+        else:
+            self.compressed = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            await self.compressed(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,83 @@
+# backend/app/llm.py
+import asyncio
+import threading
+from typing import Dict, Tuple
+
+import google.generativeai as genai
+from google.ai import generativelanguage as glm
+
+from .decoding import ANSWER_RESPONSE_SCHEMA, JSON_MIME_TYPE
+
+ClientKey = Tuple[str, str, float, int]
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class LLMClientRegistry:
+    """
+    Warm, reusable Gemini models keyed by (api_key, model, temperature,
+    max_output_tokens).
+
+    Each model gets its own gRPC clients bound to its API key instead of going
+    through the global genai.configure() state, so the channel and its
+    keep-alive connection are set up once and shared by every request.
+    """
+
+    def __init__(self):
+        self._models: Dict[ClientKey, genai.GenerativeModel] = {}
+        self._lock = threading.Lock()
+
+    def get_model(
+        self, api_key: str, model_name: str, temperature: float, max_output_tokens: int
+    ) -> genai.GenerativeModel:
+        key = (api_key, model_name, temperature, max_output_tokens)
+        model = self._models.get(key)
+        if model is None:
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    model = self._models[key] = self._build(*key)
+
+        # grpc.aio channels bind to the running loop, so create them lazily
+        if model._async_client is None and _in_event_loop():
+            with self._lock:
+                if model._async_client is None:
+                    model._async_client = glm.GenerativeServiceAsyncClient(
+                        client_options={"api_key": api_key}
+                    )
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    @staticmethod
+    def _build(
+        api_key: str, model_name: str, temperature: float, max_output_tokens: int
+    ):
+        # Constrain output to JSON matching the answer schema, capped in length
+        model = genai.GenerativeModel(
+            model_name,
+            generation_config=genai.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_output_tokens or None,
+                response_mime_type=JSON_MIME_TYPE,
+                response_schema=ANSWER_RESPONSE_SCHEMA,
+            ),
+        )
+        model._client = glm.GenerativeServiceClient(
+            client_options={"api_key": api_key}
+        )
+        return model
+
+
+llm_clients = LLMClientRegistry()
@@ -1,12 +1,29 @@
 # backend/app/main.py
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
-
+from fastapi.responses import HTMLResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from .config import config_store
+from .history import history_writer
+from .httpcache import COMPRESSION_MINIMUM_SIZE, ReadCompressionMiddleware
+from .metrics import (
+    REQUEST_ERRORS,
+    REQUEST_LATENCY,
+    error_class,
+    server_timing_header,
+    start_profiler,
+    start_request_timings,
+    stop_profiler,
+)
+from .pagination import NEXT_CURSOR_HEADER
+from .precompute import corridor_precomputer
 from .routes import router
-from .services import check_configs_exist, seed_default_configs
+from .services import add_missing_configs, check_configs_exist, seed_default_configs
 from .session import SessionLocal
 
 origins = [
@@ -19,7 +36,16 @@ async def lifespan(app: FastAPI):
     with SessionLocal() as db:
         if not check_configs_exist(db):
             seed_default_configs(db)
+        else:
+            add_missing_configs(db)
+        config_store.load(db)
+    await config_store.start_listener()
+    history_writer.start()
+    corridor_precomputer.start()
     yield
+    await corridor_precomputer.stop()
+    await history_writer.stop()
+    await config_store.stop_listener()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -30,11 +56,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Retry-After", "ETag"],
 )
+app.add_middleware(ReadCompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
 
 app.include_router(router)
 
 
+def _route_label(request: Request) -> str:
+    # Use the route template, not the raw path, to keep label cardinality bounded
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """
+    Record latency and error class per route and expose the ask pipeline's
+    stage timings as a Server-Timing header. With ENABLE_PROFILING=true,
+    adding ?profile=1 to a request returns its pyinstrument profile instead.
+    """
+    timings = start_request_timings()
+    profiler = start_profiler() if request.query_params.get("profile") else None
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception as e:
+        REQUEST_ERRORS.labels(_route_label(request), error_class(500, e)).inc()
+        raise
+    finally:
+        profile_html = stop_profiler(profiler) if profiler else None
+
+    route = _route_label(request)
+    REQUEST_LATENCY.labels(request.method, route, str(response.status_code)).observe(
+        time.perf_counter() - started
+    )
+    failure = error_class(response.status_code)
+    if failure:
+        REQUEST_ERRORS.labels(route, failure).inc()
+
+    if profile_html is not None:
+        return HTMLResponse(profile_html)
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
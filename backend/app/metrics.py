@@ -0,0 +1,282 @@
+# backend/app/metrics.py
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # pragma: no cover - profiling is an optional extra
+    Profiler = None
+
+from .admission import admission_controller
+from .cache import response_cache
+from .gateway import llm_gateway
+from .history import history_writer
+from .prompts import prompt_templates
+from .session import get_pool_status
+from .singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = "travel_docs"
+
+# Per-request profiling is only honoured when explicitly enabled
+ENABLE_PROFILING = os.getenv("ENABLE_PROFILING", "false").lower() == "true"
+if ENABLE_PROFILING and Profiler is None:
+    logger.warning("ENABLE_PROFILING is set but pyinstrument is not installed; ?profile=1 is ignored")
+
+GATEWAY_EVENTS = (
+    "calls",
+    "retries",
+    "throttled",
+    "timeouts",
+    "failures",
+    "rejected",
+    "fallbacks",
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    f"{METRICS_PREFIX}_http_request_duration_seconds",
+    "Time until the response starts, per route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_ERRORS = Counter(
+    f"{METRICS_PREFIX}_http_request_errors_total",
+    "Failed requests per route and error class",
+    ["route", "error_class"],
+)
+STAGE_LATENCY = Histogram(
+    f"{METRICS_PREFIX}_stage_duration_seconds",
+    "Time spent in each stage of the ask pipeline",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+ADMISSION_WAIT = Histogram(
+    f"{METRICS_PREFIX}_admission_wait_seconds",
+    "Time admitted requests spent queued for a generation slot, per priority",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    f"{METRICS_PREFIX}_llm_tokens_total",
+    "Gemini tokens reported in usage_metadata, per prompt template",
+    ["model", "template", "kind"],
+)
+
+_profiler_slot = threading.Lock()
+
+# Stage timings of the current request, for the Server-Timing header
+_stage_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "stage_timings", default=None
+)
+
+
+def start_request_timings() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    _stage_timings.set(timings)
+    return timings
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as one stage of the ask pipeline."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_LATENCY.labels(name).observe(elapsed)
+        timings = _stage_timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()
+    )
+
+
+def record_llm_usage(model: str, template: str, response):
+    """Count the prompt and output tokens Gemini reports for a response."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    counts = {
+        kind: getattr(usage, field, 0) or 0
+        for kind, field in (
+            ("prompt", "prompt_token_count"),
+            ("output", "candidates_token_count"),
+            ("total", "total_token_count"),
+        )
+    }
+    for kind, count in counts.items():
+        if count:
+            LLM_TOKENS.labels(model, template, kind).inc(count)
+    prompt_templates.record_usage(template, counts["prompt"], counts["output"])
+
+
+def error_class(
+    status_code: int, error: Optional[BaseException] = None
+) -> Optional[str]:
+    if error is not None:
+        return type(error).__name__
+    if status_code >= 500:
+        return "server_error"
+    if status_code == 429:
+        return "rate_limited"
+    if status_code >= 400:
+        return "client_error"
+    return None
+
+
+def start_profiler():
+    """
+    Start a sampling profiler for one request. Returns None when profiling is
+    disabled, pyinstrument is not installed or another request is being
+    profiled, since only one profiler can run per thread.
+    """
+    if not ENABLE_PROFILING or Profiler is None:
+        return None
+    if not _profiler_slot.acquire(blocking=False):
+        return None
+    profiler = Profiler(interval=0.001, async_mode="enabled")
+    profiler.start()
+    return profiler
+
+
+def stop_profiler(profiler) -> str:
+    """Stop a profiler started by start_profiler and render it as HTML."""
+    try:
+        profiler.stop()
+        return profiler.output_html()
+    finally:
+        _profiler_slot.release()
+
+
+class ApplicationStateCollector:
+    """
+    Exports the counters the app already keeps (response cache, single-flight,
+    admission control, LLM gateway, history writer, DB pools) at scrape time,
+    so the request path does no extra bookkeeping for them.
+    """
+
+    def collect(self):
+        cache = response_cache.stats()
+        lookups = CounterMetricFamily(
+            f"{METRICS_PREFIX}_cache_lookups",
+            "Answer cache lookups by outcome",
+            labels=["outcome"],
+        )
+        for outcome in ("hits", "shared_hits", "misses"):
+            lookups.add_metric([outcome], cache[outcome])
+        yield lookups
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_cache_hit_ratio",
+            "Share of lookups answered from a cache",
+            value=cache["hit_ratio"],
+        )
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_cache_entries",
+            "Entries in the in-process answer cache",
+            value=cache["size"],
+        )
+        yield CounterMetricFamily(
+            f"{METRICS_PREFIX}_singleflight_coalesced",
+            "Requests that reused an in-flight LLM call",
+            value=single_flight.stats()["coalesced"],
+        )
+
+        admission = admission_controller.stats()
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_admission_active",
+            "Requests holding a generation slot",
+            value=admission["active"],
+        )
+        depth = GaugeMetricFamily(
+            f"{METRICS_PREFIX}_admission_queue_depth",
+            "Requests queued for a generation slot, per priority",
+            labels=["priority"],
+        )
+        admitted = CounterMetricFamily(
+            f"{METRICS_PREFIX}_admission_admitted",
+            "Requests admitted to generate an answer, per priority",
+            labels=["priority"],
+        )
+        rejected = CounterMetricFamily(
+            f"{METRICS_PREFIX}_admission_rejected",
+            "Requests shed or over quota, per priority and reason",
+            labels=["priority", "reason"],
+        )
+        for klass in admission["classes"]:
+            depth.add_metric([klass["priority"]], klass["queued"])
+            admitted.add_metric([klass["priority"]], klass["admitted"])
+            for reason, count in klass["rejected"].items():
+                rejected.add_metric([klass["priority"], reason], count)
+        yield depth
+        yield admitted
+        yield rejected
+
+        gateway = llm_gateway.stats()
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_llm_in_flight",
+            "Gemini calls in flight",
+            value=gateway["in_flight"],
+        )
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_llm_circuit_open",
+            "1 while the LLM circuit breaker rejects calls",
+            value=1 if gateway["circuit_state"] == "open" else 0,
+        )
+        events = CounterMetricFamily(
+            f"{METRICS_PREFIX}_llm_events",
+            "LLM gateway calls, retries and failures",
+            labels=["event"],
+        )
+        for event in GATEWAY_EVENTS:
+            events.add_metric([event], gateway[event])
+        yield events
+
+        history = history_writer.stats()
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_history_queue_depth",
+            "History rows waiting to be written",
+            value=history["queue_depth"],
+        )
+        yield GaugeMetricFamily(
+            f"{METRICS_PREFIX}_history_last_flush_seconds",
+            "Duration of the last history bulk insert",
+            value=history["last_flush_ms"] / 1000,
+        )
+        rows = CounterMetricFamily(
+            f"{METRICS_PREFIX}_history_rows",
+            "History rows by outcome",
+            labels=["outcome"],
+        )
+        for outcome in ("written", "dropped", "failed"):
+            rows.add_metric([outcome], history[outcome])
+        yield rows
+
+        connections = GaugeMetricFamily(
+            f"{METRICS_PREFIX}_db_pool_connections",
+            "Database pool connections by state",
+            labels=["pool", "state"],
+        )
+        for pool in get_pool_status()["pools"]:
+            for state in ("size", "checkedout", "checkedin", "overflow"):
+                if state in pool:
+                    connections.add_metric([pool["name"], state], pool[state])
+        yield connections
+
+
+REGISTRY.register(ApplicationStateCollector())
@@ -2,35 +2,191 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    or_,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import relationship
 
+from .decoding import ANSWER_FIELDS
 from .session import Base
 
+# Native JSONB on Postgres, plain JSON elsewhere; the driver (de)serializes it
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class ApplicationConfig(Base):
     __tablename__ = "application_config"
 
     id = Column(String(50), primary_key=True)
     config_key = Column(String(50), unique=True, nullable=False)
-    config_value = Column(String(255), nullable=False)
+    config_value = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
 
     def __repr__(self):
         return f"<ApplicationConfig(key='{self.config_key}', value='{self.config_value[:50]}...')>"
 
 
+class TravelAnswer(Base):
+    """One distinct answer body, shared by every history row that received it."""
+
+    __tablename__ = "travel_answers"
+
+    answer_hash = Column(String(64), primary_key=True)  # see answers.answer_hash()
+    body = Column(JSONType, nullable=False)  # the ANSWER_FIELDS lists
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    @classmethod
+    def documents_contain(cls, document: str):
+        """Containment filter served by the ix_travel_answers_body GIN index."""
+        body = type_coerce(cls.body, JSONB)
+        return or_(*(body.contains({field: [document]}) for field in ANSWER_FIELDS))
+
+    def __repr__(self):
+        return f"<TravelAnswer(hash='{self.answer_hash[:12]}')>"
+
+
 class TravelDocumentQuery(Base):
     __tablename__ = "travel_document_queries"
 
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     origin_country = Column(String(100), nullable=False)
     destination_country = Column(String(100), nullable=False)
-    visa_documents = Column(Text)  # JSON string
-    passport_requirements = Column(Text)  # JSON string
-    additional_documents = Column(Text)  # JSON string
-    travel_advisories = Column(Text)  # JSON string
+    answer_hash = Column(
+        String(64), ForeignKey("travel_answers.answer_hash"), nullable=False, index=True
+    )
     queried_at = Column(DateTime, default=datetime.utcnow)
+    cache_key = Column(String(64), index=True)  # ResponseCache key digest
+    # How the answer was served: "llm", "cache" or "fallback" (AskResult.source)
+    source = Column(String(16), nullable=False, default="llm", server_default="llm")
+
+    # Answers are few and shared, so they are always joined in with the row
+    answer = relationship(TravelAnswer, lazy="joined", innerjoin=True)
+
+    __table_args__ = (
+        Index("ix_travel_document_queries_queried_at", "queried_at", "id"),
+        Index(
+            "ix_travel_document_queries_corridor",
+            "origin_country",
+            "destination_country",
+            "queried_at",
+        ),
+    )
+
+    @classmethod
+    def documents_contain(cls, document: str):
+        """Rows whose answer lists `document` in any section."""
+        return cls.answer_hash.in_(
+            select(TravelAnswer.answer_hash).where(
+                TravelAnswer.documents_contain(document)
+            )
+        )
+
+    @property
+    def visa_documents(self):
+        return self.answer.body["visa_documents"]
+
+    @property
+    def passport_requirements(self):
+        return self.answer.body["passport_requirements"]
+
+    @property
+    def additional_documents(self):
+        return self.answer.body["additional_documents"]
+
+    @property
+    def travel_advisories(self):
+        return self.answer.body["advisories"]
+
+    def to_response(self) -> dict:
+        return {field: self.answer.body[field] for field in ANSWER_FIELDS}
 
     def __repr__(self):
         return f"<TravelDocumentQuery(origin='{self.origin_country}', destination='{self.destination_country}')>"
+
+
+class PrecomputedCorridor(Base):
+    __tablename__ = "precomputed_corridors"
+
+    cache_key = Column(String(64), primary_key=True)  # ResponseCache key digest
+    origin_country = Column(String(100), nullable=False)  # normalized name
+    destination_country = Column(String(100), nullable=False)  # normalized name
+    answer = Column(JSONType, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_precomputed_corridors_corridor", "origin_country", "destination_country"
+        ),
+    )
+
+    def to_response(self) -> dict:
+        return {**self.answer, "generated_at": self.refreshed_at.isoformat()}
+
+    def __repr__(self):
+        return f"<PrecomputedCorridor(origin='{self.origin_country}', destination='{self.destination_country}')>"
+
+
+class CorridorInvalidation(Base):
+    """
+    Last manual invalidation of a corridor. Stored answers from before it are
+    never served, by any worker and across restarts.
+    """
+
+    __tablename__ = "corridor_invalidations"
+
+    origin_country = Column(String(100), primary_key=True)  # normalized name
+    destination_country = Column(String(100), primary_key=True)  # normalized name
+    invalidated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<CorridorInvalidation(origin='{self.origin_country}', destination='{self.destination_country}')>"
+
+
+class CorridorStats(Base):
+    """All-time rollup of one corridor's history, maintained on history insert."""
+
+    __tablename__ = "corridor_stats"
+
+    origin_country = Column(String(100), primary_key=True)  # normalized name
+    destination_country = Column(String(100), primary_key=True)  # normalized name
+    queries = Column(Integer, nullable=False, default=0)
+    answer_changes = Column(Integer, nullable=False, default=0)
+    first_queried_at = Column(DateTime, nullable=False)
+    last_answered_at = Column(DateTime, nullable=False)
+    last_answer_hash = Column(String(64), nullable=False)
+
+    __table_args__ = (Index("ix_corridor_stats_queries", "queries"),)
+
+    def __repr__(self):
+        return f"<CorridorStats(origin='{self.origin_country}', destination='{self.destination_country}')>"
+
+
+class CorridorDailyStats(Base):
+    """Per-day rollup of one corridor's history, maintained on history insert."""
+
+    __tablename__ = "corridor_daily_stats"
+
+    origin_country = Column(String(100), primary_key=True)  # normalized name
+    destination_country = Column(String(100), primary_key=True)  # normalized name
+    day = Column(Date, primary_key=True)  # UTC date of queried_at
+    queries = Column(Integer, nullable=False, default=0)
+    answer_changes = Column(Integer, nullable=False, default=0)
+    last_answered_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_corridor_daily_stats_day", "day"),)
+
+    def __repr__(self):
+        return f"<CorridorDailyStats(origin='{self.origin_country}', destination='{self.destination_country}', day={self.day})>"
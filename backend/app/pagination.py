@@ -0,0 +1,29 @@
+# backend/app/pagination.py
+import base64
+import binascii
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(queried_at: datetime, query_id: UUID) -> str:
+    """Opaque keyset cursor pointing just past a (queried_at, id) row."""
+    raw = f"{queried_at.isoformat()}|{query_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        queried_at, query_id = (
+            base64.urlsafe_b64decode(padded).decode("utf-8").split("|")
+        )
+        return datetime.fromisoformat(queried_at), UUID(query_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor"
+        )
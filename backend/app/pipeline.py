@@ -0,0 +1,356 @@
+# backend/app/pipeline.py
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .admission import Client, QuotaExceeded, admission_controller
+from .cache import (
+    CacheKey,
+    get_fallback_response_async,
+    get_precomputed_answer,
+    get_shared_response_async,
+    make_cache_key,
+    response_cache,
+)
+from .config import ConfigSnapshot, config_store
+from .gateway import LLMUnavailableError, llm_gateway
+from .history import history_writer
+from .metrics import ADMISSION_WAIT, stage
+from .schemas import TravelDocumentRequest
+from .services import (
+    build_history_values,
+    generate_travel_text,
+    parse_travel_answer,
+    stream_travel_text,
+)
+from .session import AsyncSessionLocal
+from .singleflight import single_flight
+from .streaming import SectionStreamParser, answer_events
+
+
+class AskResult(NamedTuple):
+    answer: dict
+    source: str  # "cache", "llm" or "fallback"
+    cache_key: CacheKey
+
+
+def normalize_request(config: ConfigSnapshot, request: TravelDocumentRequest) -> CacheKey:
+    """Map a request onto the cache key of its normalized corridor."""
+    return make_cache_key(
+        request.origin,
+        request.destination,
+        config.default_response_language,
+        config.llm_model,
+        config.llm_temperature,
+    )
+
+
+class AnswerCache:
+    """
+    Cache stage: the in-process LRU, then precomputed and shared answers in
+    the database, then the answer of a near-identical corridor.
+    """
+
+    async def _find(
+        self, db: AsyncSession, config: ConfigSnapshot, key: CacheKey
+    ) -> Tuple[Optional[dict], str]:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached, "local"
+        cached = await get_precomputed_answer(db, key, config.precompute_max_age_seconds)
+        if cached is None and config.enable_shared_cache:
+            cached = await get_shared_response_async(db, key)
+        if cached is not None:
+            response_cache.set(key, cached)
+        return cached, "shared"
+
+    async def lookup(
+        self, db: AsyncSession, config: ConfigSnapshot, key: CacheKey
+    ) -> Optional[dict]:
+        cached, tier = await self._find(db, config, key)
+        if cached is None:
+            response_cache.record_miss()
+            return None
+        response_cache.record_hit(tier)
+        return cached
+
+    def remember(self, key: CacheKey, answer: dict):
+        response_cache.set(key, answer)
+
+    async def fallback(self, db: AsyncSession, key: CacheKey) -> Optional[dict]:
+        """Last known answer for the corridor, served while the LLM is unavailable."""
+        answer = await get_fallback_response_async(db, key)
+        if answer is not None:
+            llm_gateway.fallbacks += 1
+        return answer
+
+
+def persist_answer(
+    config: ConfigSnapshot,
+    request: TravelDocumentRequest,
+    key: CacheKey,
+    answer: dict,
+    source: str = "llm",
+):
+    """
+    Persist stage: queue the history row for the write-behind history writer.
+    Every ask is recorded, however it was answered, so history and the
+    rollups built from it count queries rather than Gemini calls.
+    """
+    if config.enable_history:
+        with stage("history"):
+            history_writer.submit(build_history_values(request, answer, key, source))
+
+
+def flight_key(key: CacheKey, client: Optional[Client]) -> str:
+    """
+    Single-flight key of a request. Callers only share a call within their
+    priority class, so none inherits another class's queue position, deadline
+    or rejection.
+    """
+    return key.digest if client is None else f"{key.digest}-{client.priority}"
+
+
+def error_detail(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return error.detail
+    if isinstance(error, (LLMUnavailableError, QuotaExceeded)):
+        return str(error)
+    return f"Error processing travel document request: {str(error)}"
+
+
+@dataclass
+class TravelDocsService:
+    """
+    The ask pipeline shared by /api/ask, its streaming and batch variants, the
+    CLI and the precompute worker:
+
+        normalize -> cache -> generate (LLM gateway) -> decode -> persist
+
+    Each stage is a replaceable attribute, so a caller can swap one out (for
+    example a different cache or a no-op persist) without touching the
+    orchestration, which owns single-flight, admission, fallbacks and
+    batching.
+
+    Requests that carry a Client are charged to its quota on a cache miss and
+    queue for admission before generating. Cache hits are never charged, and
+    requests coalesced onto an in-flight call of their class never queue.
+    """
+
+    normalize: Callable[[ConfigSnapshot, TravelDocumentRequest], CacheKey] = normalize_request
+    cache: AnswerCache = field(default_factory=AnswerCache)
+    generate: Callable[
+        [ConfigSnapshot, TravelDocumentRequest], Awaitable[str]
+    ] = generate_travel_text
+    stream_text: Callable[
+        [ConfigSnapshot, TravelDocumentRequest], AsyncIterator[str]
+    ] = stream_travel_text
+    decode: Callable[[ConfigSnapshot, str], Awaitable[dict]] = parse_travel_answer
+    persist: Callable[
+        [ConfigSnapshot, TravelDocumentRequest, CacheKey, dict, str], None
+    ] = persist_answer
+
+    async def answer(self, config: ConfigSnapshot, request: TravelDocumentRequest) -> dict:
+        """Generate and decode a fresh answer, bypassing cache and persistence."""
+        return await self.decode(config, await self.generate(config, request))
+
+    @asynccontextmanager
+    async def _admitted(self, client: Optional[Client]):
+        """Hold an admission slot for the block; internal callers pass no client."""
+        if client is None:
+            yield
+            return
+        # Don't wait out the queue only to be turned away by an open circuit
+        llm_gateway.fail_fast()
+        async with AsyncExitStack() as stack:
+            with stage("admission"):
+                waited = await stack.enter_async_context(admission_controller.admit(client))
+            ADMISSION_WAIT.labels(client.priority).observe(waited)
+            yield
+
+    async def _admitted_answer(
+        self, config: ConfigSnapshot, request: TravelDocumentRequest, client: Optional[Client]
+    ) -> dict:
+        async with self._admitted(client):
+            return await self.answer(config, request)
+
+    async def ask(
+        self, db: AsyncSession, request: TravelDocumentRequest, client: Optional[Client] = None
+    ) -> AskResult:
+        """
+        Answer one request. Raises LLMUnavailableError when the LLM is down or
+        the request is shed by admission control and no earlier answer for the
+        corridor exists, and QuotaExceeded when the client is over its quota.
+        """
+        with stage("config"):
+            config = config_store.get()
+            key = self.normalize(config, request)
+        with stage("cache_lookup"):
+            cached = await self.cache.lookup(db, config, key)
+        if cached is not None:
+            self.persist(config, request, key, cached, "cache")
+            return AskResult(cached, "cache", key)
+
+        if client is not None:
+            admission_controller.check_quota(client)
+
+        # Don't hold a pooled connection for the length of the LLM call; the
+        # session checks one out again if it needs a fallback answer
+        await db.close()
+
+        # Identical in-flight requests wait for this one instead of calling Gemini
+        try:
+            answer = await single_flight.do(
+                flight_key(key, client), lambda: self._admitted_answer(config, request, client)
+            )
+        except LLMUnavailableError:
+            fallback = await self.cache.fallback(db, key)
+            if fallback is None:
+                raise
+            self.persist(config, request, key, fallback, "fallback")
+            return AskResult(fallback, "fallback", key)
+        self.cache.remember(key, answer)
+        self.persist(config, request, key, answer, "llm")
+        return AskResult(answer, "llm", key)
+
+    async def stream(
+        self, db: AsyncSession, request: TravelDocumentRequest, client: Optional[Client] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Check that a request can be answered, then return its event stream:
+        one "item" event per document as soon as it is generated and a final
+        "done" event. Failures after that point become an "error" event.
+        Raises QuotaExceeded when the client is over its quota.
+        """
+        config = config_store.get()
+        key = self.normalize(config, request)
+        cached = await self.cache.lookup(db, config, key)
+        source = "cache"
+        if cached is None:
+            config.require_google_api_key()
+
+            # Fail fast while the circuit is open rather than opening a doomed stream
+            if llm_gateway.breaker.state == "open":
+                cached = await self.cache.fallback(db, key)
+                source = "fallback"
+                if cached is None:
+                    raise llm_gateway.unavailable()
+            elif client is not None:
+                admission_controller.check_quota(client)
+        # The events below never touch the session
+        await db.close()
+
+        async def events():
+            if cached is not None:
+                self.persist(config, request, key, cached, source)
+                for event in answer_events(cached):
+                    yield event
+                return
+
+            parser = SectionStreamParser()
+            try:
+                async with self._admitted(client):
+                    async for text in self.stream_text(config, request):
+                        for event in parser.feed(text):
+                            yield event
+                answer = await self.decode(config, parser.text)
+            except Exception as e:
+                event = {"event": "error", "detail": error_detail(e)}
+                if isinstance(e, LLMUnavailableError):
+                    event["retry_after"] = e.retry_after
+                yield event
+                return
+
+            self.cache.remember(key, answer)
+            self.persist(config, request, key, answer, "llm")
+            yield {"event": "done", "result": answer}
+
+        return events()
+
+    async def batch(
+        self,
+        db: AsyncSession,
+        requests: List[TravelDocumentRequest],
+        client: Optional[Client] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Check that a batch can be answered, then return its event stream: a
+        "result" or "error" event per request as soon as it completes (cached
+        ones first) and a final "done" event. Misses are generated with
+        batch_concurrency calls at a time.
+        """
+        config = config_store.get()
+        keys = [self.normalize(config, request) for request in requests]
+        cached: Dict[int, dict] = {}
+        for index, key in enumerate(keys):
+            answer = await self.cache.lookup(db, config, key)
+            if answer is not None:
+                cached[index] = answer
+        misses = [index for index in range(len(requests)) if index not in cached]
+        if misses:
+            config.require_google_api_key()
+        # Misses fall back through sessions of their own
+        await db.close()
+
+        semaphore = asyncio.Semaphore(max(1, config.batch_concurrency))
+
+        def batch_event(index: int, **fields) -> dict:
+            return {
+                "event": "error" if "detail" in fields else "result",
+                "index": index,
+                "origin": requests[index].origin,
+                "destination": requests[index].destination,
+                **fields,
+            }
+
+        async def answer_miss(index: int) -> dict:
+            request, key = requests[index], keys[index]
+            try:
+                if client is not None:
+                    admission_controller.check_quota(client)
+                async with semaphore:
+                    answer = await single_flight.do(
+                        flight_key(key, client),
+                        lambda: self._admitted_answer(config, request, client),
+                    )
+            except LLMUnavailableError as e:
+                # The caller's session is shared by every task, so use a fresh one
+                async with AsyncSessionLocal() as fallback_db:
+                    fallback = await self.cache.fallback(fallback_db, key)
+                if fallback is not None:
+                    self.persist(config, request, key, fallback, "fallback")
+                    return batch_event(index, cached=True, result=fallback)
+                return batch_event(index, detail=error_detail(e))
+            except Exception as e:
+                return batch_event(index, detail=error_detail(e))
+
+            self.cache.remember(key, answer)
+            self.persist(config, request, key, answer, "llm")
+            return batch_event(index, cached=False, result=answer)
+
+        async def events():
+            for index, answer in cached.items():
+                self.persist(config, requests[index], keys[index], answer, "cache")
+                yield batch_event(index, cached=True, result=answer)
+
+            tasks = [asyncio.create_task(answer_miss(index)) for index in misses]
+            failed = 0
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    event = await next_done
+                    failed += event["event"] == "error"
+                    yield event
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            yield {"event": "done", "answered": len(requests) - failed, "failed": failed}
+
+        return events()
+
+
+travel_docs = TravelDocsService()
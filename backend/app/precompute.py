@@ -0,0 +1,230 @@
+# backend/app/precompute.py
+import asyncio
+import logging
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from itertools import permutations
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import CacheKey, normalize_country
+from .config import ConfigSnapshot, config_store
+from .models import PrecomputedCorridor, TravelDocumentQuery
+from .pipeline import travel_docs
+from .schemas import TravelDocumentRequest
+from .session import AsyncSessionLocal, async_engine
+
+logger = logging.getLogger(__name__)
+
+# How far back query history is scanned to find the most popular corridors
+HISTORY_LOOKBACK = timedelta(days=30)
+
+# Postgres advisory lock key held by the one worker running a precompute cycle
+PRECOMPUTE_LOCK_ID = 7_220_815_301
+
+Corridor = Tuple[str, str]
+
+
+def _corridor_request(corridor: Corridor) -> TravelDocumentRequest:
+    return TravelDocumentRequest(origin=corridor[0], destination=corridor[1])
+
+
+def _corridor_key(config: ConfigSnapshot, corridor: Corridor) -> CacheKey:
+    return travel_docs.normalize(config, _corridor_request(corridor))
+
+
+@asynccontextmanager
+async def _cycle_lock() -> AsyncIterator[bool]:
+    """
+    Hold the precompute lock for one cycle; yields False when another worker
+    holds it. Advisory locks are Postgres-only; other databases run one worker.
+    """
+    if async_engine.url.get_backend_name() != "postgresql":
+        yield True
+        return
+    async with async_engine.connect() as connection:
+        acquired = await connection.scalar(
+            text("SELECT pg_try_advisory_lock(:id)"), {"id": PRECOMPUTE_LOCK_ID}
+        )
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await connection.execute(
+                    text("SELECT pg_advisory_unlock(:id)"), {"id": PRECOMPUTE_LOCK_ID}
+                )
+
+
+def delete_precomputed_corridor(db: Session, origin: str, destination: str) -> int:
+    """Delete precomputed answers for a corridor in every language and model."""
+    result = db.execute(
+        delete(PrecomputedCorridor).where(
+            PrecomputedCorridor.origin_country == normalize_country(origin),
+            PrecomputedCorridor.destination_country == normalize_country(destination),
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+class CorridorPrecomputer:
+    """
+    In-process scheduler that keeps answers for popular corridors precomputed.
+
+    Every precompute_interval_seconds it picks the top-N corridors from recent
+    query history plus every pair of the configured precompute_countries, and
+    regenerates those whose answer is missing or past half its max age, so
+    /api/ask can serve them without calling Gemini. Every worker runs the
+    scheduler, but a cycle only runs in the worker holding the precompute
+    advisory lock; the others find the corridors fresh on their next cycle.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_selected = 0
+        self.last_refreshed = 0
+        self.last_failed = 0
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        config = config_store.get()
+        return {
+            "enabled": config.enable_precompute,
+            "running": self._task is not None and not self._task.done(),
+            "last_run_at": self.last_run_at,
+            "selected_corridors": self.last_selected,
+            "refreshed_corridors": self.last_refreshed,
+            "failed_corridors": self.last_failed,
+        }
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except Exception:
+                logger.exception("Corridor precompute run failed")
+            await asyncio.sleep(max(60, config_store.get().precompute_interval_seconds))
+
+    async def refresh_once(self) -> int:
+        config = config_store.get()
+        if not config.enable_precompute or not config.api_keys:
+            return 0
+
+        async with _cycle_lock() as leader:
+            if not leader:
+                logger.debug("Corridor precompute is running in another worker")
+                return 0
+            return await self._refresh_cycle(config)
+
+    async def _refresh_cycle(self, config: ConfigSnapshot) -> int:
+        async with AsyncSessionLocal() as db:
+            corridors = await self._select_corridors(db, config)
+            stale = await self._stale_corridors(db, config, corridors)
+
+        semaphore = asyncio.Semaphore(max(1, config.batch_concurrency))
+        outcomes = await asyncio.gather(
+            *(self._refresh(config, corridor, semaphore) for corridor in stale)
+        )
+
+        self.last_run_at = datetime.utcnow()
+        self.last_selected = len(corridors)
+        self.last_refreshed = sum(outcomes)
+        self.last_failed = len(outcomes) - self.last_refreshed
+        return self.last_refreshed
+
+    async def _select_corridors(
+        self, db: AsyncSession, config: ConfigSnapshot
+    ) -> List[Corridor]:
+        rows = await db.execute(
+            select(
+                TravelDocumentQuery.origin_country,
+                TravelDocumentQuery.destination_country,
+                func.count().label("queries"),
+            )
+            .where(TravelDocumentQuery.queried_at >= datetime.utcnow() - HISTORY_LOOKBACK)
+            .group_by(
+                TravelDocumentQuery.origin_country,
+                TravelDocumentQuery.destination_country,
+            )
+        )
+
+        # Merge spellings that normalize to the same corridor
+        counts: Counter = Counter()
+        names: Dict[Corridor, Corridor] = {}
+        for origin, destination, queries in rows:
+            normalized = (normalize_country(origin), normalize_country(destination))
+            counts[normalized] += queries
+            names.setdefault(normalized, (origin, destination))
+
+        selected = [names[c] for c, _ in counts.most_common(config.precompute_top_n)]
+        seen = {(normalize_country(o), normalize_country(d)) for o, d in selected}
+        for corridor in permutations(config.precompute_countries, 2):
+            normalized = (normalize_country(corridor[0]), normalize_country(corridor[1]))
+            if normalized not in seen:
+                seen.add(normalized)
+                selected.append(corridor)
+        return selected
+
+    async def _stale_corridors(
+        self, db: AsyncSession, config: ConfigSnapshot, corridors: List[Corridor]
+    ) -> List[Corridor]:
+        if not corridors:
+            return []
+        # Refresh ahead of expiry so popular corridors never fall back to the LLM
+        fresh_after = datetime.utcnow() - timedelta(
+            seconds=config.precompute_max_age_seconds / 2
+        )
+        digests = {_corridor_key(config, c).digest: c for c in corridors}
+        fresh = set(
+            await db.scalars(
+                select(PrecomputedCorridor.cache_key).where(
+                    PrecomputedCorridor.cache_key.in_(digests),
+                    PrecomputedCorridor.refreshed_at >= fresh_after,
+                )
+            )
+        )
+        return [c for digest, c in digests.items() if digest not in fresh]
+
+    async def _refresh(
+        self, config: ConfigSnapshot, corridor: Corridor, semaphore: asyncio.Semaphore
+    ) -> bool:
+        key = _corridor_key(config, corridor)
+        try:
+            async with semaphore:
+                answer = await travel_docs.answer(config, _corridor_request(corridor))
+        except Exception as e:
+            logger.warning("Failed to precompute %s -> %s: %s", *corridor, e)
+            return False
+
+        async with AsyncSessionLocal() as db:
+            row = await db.merge(
+                PrecomputedCorridor(
+                    cache_key=key.digest,
+                    origin_country=key.origin,
+                    destination_country=key.destination,
+                    answer=answer,
+                    refreshed_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+        travel_docs.cache.remember(key, row.to_response())
+        return True
+
+
+corridor_precomputer = CorridorPrecomputer()
@@ -0,0 +1,131 @@
+# backend/app/prompts.py
+import re
+import threading
+from datetime import datetime
+from string import Template
+from typing import Dict, List, NamedTuple
+
+from .decoding import ANSWER_FIELDS
+from .schemas import TravelDocumentRequest
+
+# Longest broken answer echoed back in a repair prompt
+MAX_REPAIR_INPUT_CHARS = 6000
+
+_SPACES = re.compile(r"[ \t]+")
+
+
+def minimize_whitespace(text: str) -> str:
+    """Drop indentation, blank lines and repeated spaces; each costs input tokens."""
+    lines = (_SPACES.sub(" ", line).strip() for line in text.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class Prompt(NamedTuple):
+    template: str
+    text: str
+
+
+class PromptTemplate:
+    """
+    A prompt compiled once at import: whitespace-minimized, with `$name`
+    placeholders filled per request. Substituted values are inserted as-is.
+    Keeps running totals of the tokens Gemini reports for its prompts.
+    """
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.text = minimize_whitespace(source)
+        self._template = Template(self.text)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def render(self, **values) -> Prompt:
+        return Prompt(self.name, self._template.substitute(values))
+
+    def record_usage(self, prompt_tokens: int, output_tokens: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.calls
+            return {
+                "name": self.name,
+                "template_chars": len(self.text),
+                "calls": calls,
+                "prompt_tokens": self.prompt_tokens,
+                "output_tokens": self.output_tokens,
+                "avg_prompt_tokens": round(self.prompt_tokens / calls, 1) if calls else 0.0,
+                "avg_output_tokens": round(self.output_tokens / calls, 1) if calls else 0.0,
+            }
+
+
+class PromptRegistry:
+    """Every prompt the app sends to Gemini, by name."""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, source: str) -> PromptTemplate:
+        template = self._templates[name] = PromptTemplate(name, source)
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def record_usage(self, name: str, prompt_tokens: int, output_tokens: int):
+        template = self._templates.get(name)
+        if template is not None:
+            template.record_usage(prompt_tokens, output_tokens)
+
+    def stats(self) -> List[dict]:
+        return [template.stats() for template in self._templates.values()]
+
+
+prompt_templates = PromptRegistry()
+
+# The response schema already fixes the JSON shape, so no example is needed
+TRAVEL_DOCUMENTS_PROMPT = prompt_templates.register(
+    "travel_documents",
+    f"""
+    You are a travel document expert. Provide detailed requirements for traveling from $origin to $destination.
+
+    Respond with a JSON object whose keys {", ".join(ANSWER_FIELDS)} are each an array of strings.
+
+    Requirements:
+    1. Be accurate and up-to-date (current year is $year)
+    2. Include any COVID-19 requirements if applicable
+    3. Response must be in $language
+    4. Each array should have at least 2 items
+    """,
+)
+
+REPAIR_PROMPT = prompt_templates.register(
+    "repair",
+    f"""
+    Rewrite the text below as one JSON object with exactly the keys
+    {", ".join(ANSWER_FIELDS)}, each an array of strings. Keep its content
+    and language. Return only the JSON.
+
+    $text
+    """,
+)
+
+
+def build_travel_prompt(request: TravelDocumentRequest, response_language: str) -> Prompt:
+    """Build the prompt asking for the documents of one corridor."""
+    return TRAVEL_DOCUMENTS_PROMPT.render(
+        origin=request.origin,
+        destination=request.destination,
+        year=datetime.now().year,
+        language=response_language,
+    )
+
+
+def build_repair_prompt(text: str) -> Prompt:
+    """Short prompt asking the model to reformat a broken answer as valid JSON."""
+    return REPAIR_PROMPT.render(text=text[:MAX_REPAIR_INPUT_CHARS])
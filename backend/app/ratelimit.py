@@ -0,0 +1,105 @@
+# backend/app/ratelimit.py
+import asyncio
+import time
+from typing import Dict, List
+
+# Adaptive limits never drop below one call every ten seconds
+MIN_RATE_PER_SECOND = 0.1
+# Fraction of the configured rate restored after each successful call
+RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """Async token bucket; waiters are served in arrival order."""
+
+    def __init__(self, rate_per_second: float, burst: float):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated) * self.rate_per_second,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate_per_second)
+
+    def drain(self):
+        """Discard any saved-up burst so the next call waits for a fresh token."""
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key (e.g. per Gemini API key), tuned from upstream
+    feedback: a 429 halves the key's rate, and every success adds back a small
+    step until the configured requests_per_minute is reached again.
+    """
+
+    def __init__(self, requests_per_minute: int = 60):
+        self.requests_per_minute = requests_per_minute
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @property
+    def _ceiling(self) -> float:
+        return self.requests_per_minute / 60
+
+    def configure(self, requests_per_minute: int):
+        self.requests_per_minute = max(1, requests_per_minute)
+        for bucket in self._buckets.values():
+            bucket.rate_per_second = min(bucket.rate_per_second, self._ceiling)
+            bucket.burst = self.requests_per_minute
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(
+                self._ceiling, self.requests_per_minute
+            )
+        return bucket
+
+    async def acquire(self, key: str):
+        await self._bucket(key).acquire()
+
+    def requests_per_minute_for(self, key: str) -> float:
+        """Current adaptive rate of a key; unused keys run at the configured rate."""
+        bucket = self._buckets.get(key)
+        return bucket.rate_per_second * 60 if bucket else float(self.requests_per_minute)
+
+    def record_throttled(self, key: str):
+        """Back off after the upstream rejected a call with 429."""
+        bucket = self._bucket(key)
+        bucket.rate_per_second = max(MIN_RATE_PER_SECOND, bucket.rate_per_second / 2)
+        bucket.burst = max(1.0, bucket.rate_per_second * 60)
+        bucket.drain()
+
+    def record_success(self, key: str):
+        bucket = self._bucket(key)
+        if bucket.rate_per_second < self._ceiling:
+            bucket.rate_per_second = min(
+                self._ceiling, bucket.rate_per_second + self._ceiling * RECOVERY_STEP
+            )
+            bucket.burst = max(1.0, bucket.rate_per_second * 60)
+
+    def stats(self) -> List[dict]:
+        # Only the key suffix is reported so API keys never leave the process
+        return [
+            {
+                "key": f"...{key[-4:]}",
+                "requests_per_minute": round(bucket.rate_per_second * 60, 2),
+            }
+            for key, bucket in self._buckets.items()
+        ]
+
+
+llm_rate_limiter = KeyedRateLimiter()
@@ -1,47 +1,106 @@
 # backend/app/routes.py
-import json
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
 from uuid import UUID
 
-import google.generativeai as genai  # Import the Google Generative AI library
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from .admission import Client, QuotaExceeded, admission_controller, client_for
+from .analytics import get_daily_stats, get_stats_summary, get_top_corridors
+from .cache import publish_corridor_invalidation, response_cache
+from .config import InvalidConfigValue, config_store, publish_config_change
+from .export import EXPORT_MEDIA_TYPES, export_history, parquet_available
+from .gateway import LLMUnavailableError, llm_gateway
 from .models import ApplicationConfig, TravelDocumentQuery
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from .history import history_writer
+from .httpcache import (
+    IMMUTABLE,
+    PRIVATE_REVALIDATE,
+    REVALIDATE,
+    conditional_json,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from .pipeline import travel_docs
+from .precompute import corridor_precomputer, delete_precomputed_corridor
+from .prompts import prompt_templates
 from .schemas import (
+    AdmissionStatsSchema,
     ApplicationConfigCreate,
     ApplicationConfigSchema,
     ApplicationConfigUpdate,
+    CacheInvalidationSchema,
+    CacheStatsSchema,
+    CorridorStatsSchema,
+    DailyStatsSchema,
+    DatabasePoolsSchema,
+    HistoryWriterStatsSchema,
+    LLMGatewayStatsSchema,
+    PrecomputeStatusSchema,
+    PromptTemplateStatsSchema,
+    StatsSummarySchema,
     TravelDocumentQuerySchema,
     TravelDocumentRequest,
     TravelDocumentResponse,
 )
-from .services import get_config_value, get_google_api_key
-from .session import get_db
+from .session import get_async_db, get_db, get_pool_status, get_read_db
+from .singleflight import single_flight
+from .streaming import NDJSON_MEDIA_TYPE, ndjson_line
 
 router = APIRouter(prefix="/api", tags=["Travel Documents"])
 
+MAX_BATCH_SIZE = 100
+
+# Settings whose values are masked in API responses
+SECRET_CONFIG_KEYS = {"google_api_key", "google_api_keys"}
+
 
 @router.get("/")
 def read_root():
     return {"message": "Travel Documents Advisor API"}
 
 
+def _unavailable(error: LLMUnavailableError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
+def _over_quota(error: QuotaExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
+    )
+
+
 @router.post(
     "/ask",
     response_model=TravelDocumentResponse,
     summary="Get travel document requirements",
 )
-def ask_travel_documents(
+async def ask_travel_documents(
     request: TravelDocumentRequest,
-    db: Session = Depends(get_db),
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get travel document requirements between two countries.
     Returns structured information about visa documents, passport requirements,
     additional documents, and travel advisories.
 
+    Requests that need a fresh answer are charged to the caller's quota, keyed
+    by its address, and queue for admission in the "api" priority class. Shed
+    requests get 503 and over-quota clients 429, both with Retry-After.
+
     Example request:
     {
         "origin": "Kenya",
@@ -56,123 +115,35 @@ def ask_travel_documents(
         "advisories": ["Check COVID requirements", "Register with embassy"]
     }
     """
-    try:
-        # Get configuration values
-        api_key = get_google_api_key(db)
-        llm_model = get_config_value(db, "llm_model", "gemini-1.5-flash-latest")
-        temperature = float(get_config_value(db, "llm_temperature", "0.3"))
-        enable_history = (
-            get_config_value(db, "enable_history", "true").lower() == "true"
-        )
-        response_language = get_config_value(db, "default_response_language", "English")
-
-        # Configure Gemini client
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(llm_model)
-
-        # Create the prompt with clear instructions for structured output
-        prompt = f"""
-        You are a travel document expert. Provide detailed requirements for traveling from {request.origin} to {request.destination}.
-        
-        Respond with a JSON object having exactly these fields:
-        - "visa_documents": array of strings listing required visa documents
-        - "passport_requirements": array of strings listing passport requirements
-        - "additional_documents": array of strings listing other required documents
-        - "advisories": array of strings listing important travel advisories
-        
-        Requirements:
-        1. Be accurate and up-to-date (current year is {datetime.now().year})
-        2. Include any COVID-19 requirements if applicable
-        3. Response must be in {response_language}
-        4. Each array should have at least 2 items
-        5. Format for direct JSON parsing
-        
-        Example structure:
-        {{
-            "visa_documents": ["item1", "item2"],
-            "passport_requirements": ["item1", "item2"],
-            "additional_documents": ["item1", "item2"],
-            "advisories": ["item1", "item2"]
-        }}
-        """
-
-        # Make the API call to Gemini
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=temperature,
-            ),
-        )
+    return await _ask(db, request, client_for(http_request, "api"))
 
-        # Parse and validate the response
-        if not response or not response.candidates:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="No response received from Gemini API",
-            )
-
-        # Extract text from the first candidate
-        response_text = ""
-        for part in response.candidates[0].content.parts:
-            if hasattr(part, "text"):
-                response_text = part.text
-                break
-
-        if not response_text:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Empty response from Gemini API",
-            )
-
-        # Clean the response (sometimes Gemini adds markdown formatting)
-        cleaned_response = (
-            response_text.strip().replace("```json", "").replace("```", "").strip()
-        )
 
-        try:
-            result = json.loads(cleaned_response)
-
-            # Validate the response structure
-            required_fields = [
-                "visa_documents",
-                "passport_requirements",
-                "additional_documents",
-                "advisories",
-            ]
-            if not all(field in result for field in required_fields):
-                raise ValueError("Missing required fields in response")
-
-            # Convert all values to lists if they aren't already
-            for field in required_fields:
-                if not isinstance(result[field], list):
-                    result[field] = [str(result[field])]
-
-            # Save to history if enabled
-            if enable_history:
-                db_query = TravelDocumentQuery(
-                    origin_country=request.origin,
-                    destination_country=request.destination,
-                    visa_documents=json.dumps(result["visa_documents"]),
-                    passport_requirements=json.dumps(result["passport_requirements"]),
-                    additional_documents=json.dumps(result["additional_documents"]),
-                    travel_advisories=json.dumps(result["advisories"]),
-                )
-                db.add(db_query)
-                db.commit()
-
-            return result
-
-        except json.JSONDecodeError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to parse Gemini response: {str(e)}. Response was: {response_text}",
-            )
-        except ValueError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Invalid response structure from Gemini: {str(e)}",
-            )
+@router.post(
+    "/ask/interactive",
+    response_model=TravelDocumentResponse,
+    summary="Get travel document requirements for someone waiting on them",
+)
+async def ask_travel_documents_interactive(
+    request: TravelDocumentRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    /api/ask for the web UI: misses queue for admission in the "interactive"
+    class, ahead of /api/ask and batch traffic. The class is only as
+    trustworthy as access to this path, so a deployment that exposes the API
+    to third parties should restrict it at the proxy.
+    """
+    return await _ask(db, request, client_for(http_request, "interactive"))
 
+
+async def _ask(db: AsyncSession, request: TravelDocumentRequest, client: Client) -> dict:
+    try:
+        return (await travel_docs.ask(db, request, client)).answer
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
+    except QuotaExceeded as e:
+        raise _over_quota(e)
     except HTTPException:
         raise  # Re-raise existing HTTP exceptions
     except Exception as e:
@@ -182,40 +153,236 @@ def ask_travel_documents(
         )
 
 
+@router.post(
+    "/ask/stream",
+    summary="Stream travel document requirements as NDJSON",
+    response_class=StreamingResponse,
+)
+async def ask_travel_documents_stream(
+    request: TravelDocumentRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Streaming variant of /api/ask. Emits one NDJSON event per document item as
+    soon as Gemini generates it, then a final "done" event with the full answer:
+
+    {"event": "item", "section": "visa_documents", "value": "Passport photos"}
+    {"event": "done", "result": {"visa_documents": [...], ...}}
+
+    Someone is watching the answer arrive, so misses queue for admission in
+    the "interactive" class, ahead of /api/ask and batch traffic. Errors after
+    the stream has started, including being shed by admission control, are
+    reported as an "error" event.
+    """
+    try:
+        events = await travel_docs.stream(db, request, client_for(http_request, "interactive"))
+    except LLMUnavailableError as e:
+        raise _unavailable(e)
+    except QuotaExceeded as e:
+        raise _over_quota(e)
+    return StreamingResponse(
+        (ndjson_line(event) async for event in events), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.post(
+    "/ask/batch",
+    summary="Get travel document requirements for many corridors",
+    response_class=StreamingResponse,
+)
+async def ask_travel_documents_batch(
+    requests: List[TravelDocumentRequest],
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Answer up to MAX_BATCH_SIZE origin/destination pairs in one call. Cached
+    pairs are streamed back immediately; the rest are sent to Gemini with
+    bounded concurrency and per-API-key rate limiting, and each result is
+    streamed as NDJSON as soon as it completes:
+
+    {"event": "result", "index": 0, "origin": "Kenya", "destination": "Ireland", "cached": true, "result": {...}}
+    {"event": "error", "index": 3, "origin": "Kenya", "destination": "Peru", "detail": "..."}
+    {"event": "done", "answered": 49, "failed": 1}
+
+    History rows for generated answers go through the write-behind history
+    writer, which bulk-inserts them. Misses queue for admission in the
+    "batch" priority class, behind interactive and API traffic.
+    """
+    if len(requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch can contain at most {MAX_BATCH_SIZE} requests.",
+        )
+
+    events = await travel_docs.batch(db, requests, client_for(http_request, "batch"))
+    return StreamingResponse(
+        (ndjson_line(event) async for event in events), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get("/cache/stats", response_model=CacheStatsSchema)
+def get_cache_stats():
+    """
+    Hit/miss counters and size of the /api/ask response cache, plus how many
+    requests were coalesced onto an in-flight LLM call
+    """
+    return {**response_cache.stats(), **single_flight.stats()}
+
+
+@router.delete("/cache", response_model=CacheInvalidationSchema)
+def invalidate_cache(origin: str, destination: str, db: Session = Depends(get_db)):
+    """
+    Invalidate every cached and precomputed answer for a single
+    origin/destination corridor, in every worker. Older answers in history
+    are no longer served from the shared cache or as fallbacks.
+    """
+    removed = response_cache.invalidate_corridor(origin, destination)
+    publish_corridor_invalidation(db, origin, destination)
+    # Commits the invalidation, which also sends the NOTIFY
+    removed_precomputed = delete_precomputed_corridor(db, origin, destination)
+    return {
+        "origin": origin,
+        "destination": destination,
+        "removed_entries": removed,
+        "removed_precomputed": removed_precomputed,
+    }
+
+
+@router.get("/history/writer", response_model=HistoryWriterStatsSchema)
+def get_history_writer_stats():
+    """
+    Queue depth, throughput and backpressure counters of the history writer
+    """
+    return history_writer.stats()
+
+
+@router.get("/db/pool", response_model=DatabasePoolsSchema)
+def get_database_pools():
+    """
+    Connection pool usage per engine, for sizing workers against Postgres
+    max_connections
+    """
+    return get_pool_status()
+
+
+@router.get("/admission", response_model=AdmissionStatsSchema)
+def get_admission_stats():
+    """
+    Active generation slots, queue depth per priority class and admitted and
+    rejected requests per class, for tuning admission control
+    """
+    return admission_controller.stats()
+
+
+@router.get("/llm/gateway", response_model=LLMGatewayStatsSchema)
+def get_llm_gateway_stats():
+    """
+    Circuit breaker state, concurrency, retry counters, the current adaptive
+    rate limit of every Gemini API key and per-key and per-model routing stats
+    """
+    return llm_gateway.stats()
+
+
+@router.get("/llm/prompts", response_model=List[PromptTemplateStatsSchema])
+def get_prompt_template_stats():
+    """
+    Size of every prompt template and the prompt and output tokens Gemini
+    reported for it, to track per-request token cost
+    """
+    return prompt_templates.stats()
+
+
+@router.get("/stats", response_model=StatsSummarySchema)
+def get_stats(db: Session = Depends(get_read_db)):
+    """
+    Totals over all history: queries, corridors, answer changes and distinct
+    stored answers. Served from the corridor rollups, not the history table.
+    """
+    return get_stats_summary(db)
+
+
+@router.get("/stats/corridors", response_model=List[CorridorStatsSchema])
+def get_corridor_stats(
+    limit: int = 20, days: Optional[int] = None, db: Session = Depends(get_read_db)
+):
+    """
+    Most-asked corridors with their answer-change count and last answer time,
+    of all time or over the last `days` days
+    """
+    if days is not None and days < 1:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="days must be at least 1.",
+        )
+    since = datetime.utcnow().date() - timedelta(days=days - 1) if days else None
+    return get_top_corridors(db, limit, since)
+
+
+@router.get("/stats/daily", response_model=List[DailyStatsSchema])
+def get_daily_corridor_stats(
+    days: int = 30,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Queries and answer changes per day over the last `days` days, for all
+    corridors or only those matching `origin`/`destination`
+    """
+    since = datetime.utcnow().date() - timedelta(days=max(1, days) - 1)
+    return get_daily_stats(db, since, origin, destination)
+
+
+@router.get("/precompute/status", response_model=PrecomputeStatusSchema)
+def get_precompute_status():
+    """
+    State of the background worker that precomputes popular corridors
+    """
+    return corridor_precomputer.status()
+
+
 @router.get("/recent-queries", response_model=List[TravelDocumentQuerySchema])
-def get_recent_queries(limit: int = 5, db: Session = Depends(get_db)):
+def get_recent_queries(
+    request: Request, limit: int = 5, db: Session = Depends(get_read_db)
+):
     """
     Get recent travel document queries (for dashboard sidebar)
+
+    History rows are immutable, so the list is versioned by its newest row: a
+    poll whose If-None-Match is still current gets a 304 without loading rows.
     """
+    newest = (
+        select(TravelDocumentQuery.id)
+        .order_by(TravelDocumentQuery.queried_at.desc(), TravelDocumentQuery.id.desc())
+        .limit(1)
+    )
+    etag = make_etag("recent-queries", limit, db.scalar(newest))
+    if etag_matches(request, etag):
+        return not_modified(etag, REVALIDATE)
+
     queries = (
         db.query(TravelDocumentQuery)
-        .order_by(TravelDocumentQuery.queried_at.desc())
+        .order_by(TravelDocumentQuery.queried_at.desc(), TravelDocumentQuery.id.desc())
         .limit(limit)
         .all()
     )
-
-    # Convert JSON strings back to lists
-    result = []
-    for query in queries:
-        result.append(
-            {
-                "id": query.id,
-                "origin_country": query.origin_country,
-                "destination_country": query.destination_country,
-                "queried_at": query.queried_at,
-                "visa_documents": json.loads(query.visa_documents),
-                "passport_requirements": json.loads(query.passport_requirements),
-                "additional_documents": json.loads(query.additional_documents),
-                "travel_advisories": json.loads(query.travel_advisories),
-            }
-        )
-    return result
+    return conditional_json(
+        request, queries, List[TravelDocumentQuerySchema], REVALIDATE, etag=etag
+    )
 
 
 @router.get("/query/{query_id}", response_model=TravelDocumentQuerySchema)
-def get_query_details(query_id: UUID, db: Session = Depends(get_db)):
+def get_query_details(
+    query_id: UUID, request: Request, db: Session = Depends(get_read_db)
+):
     """
     Get details of a specific query
+
+    A query never changes once recorded, so its ETag is its id and clients may
+    cache it indefinitely. The row is still looked up first, so a deleted
+    query is a 404 rather than a 304.
     """
     query = (
         db.query(TravelDocumentQuery).filter(TravelDocumentQuery.id == query_id).first()
@@ -226,16 +393,38 @@ def get_query_details(query_id: UUID, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND, detail="Query not found"
         )
 
-    return {
-        "id": query.id,
-        "origin_country": query.origin_country,
-        "destination_country": query.destination_country,
-        "visa_documents": json.loads(query.visa_documents),
-        "passport_requirements": json.loads(query.passport_requirements),
-        "additional_documents": json.loads(query.additional_documents),
-        "travel_advisories": json.loads(query.travel_advisories),
-        "queried_at": query.queried_at,
-    }
+    return conditional_json(
+        request, query, TravelDocumentQuerySchema, IMMUTABLE, etag=f'"{query_id}"'
+    )
+
+
+def _require_history():
+    if not config_store.get().enable_history:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Query history is disabled in application settings.",
+        )
+
+
+def _history_filters(
+    origin: Optional[str],
+    destination: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    document: Optional[str],
+) -> list:
+    filters = []
+    if origin:
+        filters.append(TravelDocumentQuery.origin_country == origin)
+    if destination:
+        filters.append(TravelDocumentQuery.destination_country == destination)
+    if since:
+        filters.append(TravelDocumentQuery.queried_at >= since)
+    if until:
+        filters.append(TravelDocumentQuery.queried_at < until)
+    if document:
+        filters.append(TravelDocumentQuery.documents_contain(document))
+    return filters
 
 
 @router.get(
@@ -244,49 +433,117 @@ def get_query_details(query_id: UUID, db: Session = Depends(get_db)):
     summary="Get query history",
 )
 def get_query_history(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    document: Optional[str] = None,
+    db: Session = Depends(get_read_db),
 ):
     """
-    Retrieve the history of travel document queries with pagination.
+    Retrieve the history of travel document queries, newest first.
+
+    Pages are keyset-paginated on (queried_at, id): when more rows may follow,
+    the X-Next-Cursor response header carries an opaque token to pass back as
+    `cursor` for the next page. `skip` is still honoured for older clients but
+    gets slower the deeper it pages.
+
+    Filter by exact `origin`/`destination`, by a `since`/`until` queried_at
+    range, or pass `document` to only return queries whose answer lists that
+    exact item.
     """
-    enable_history = get_config_value(db, "enable_history", "true").lower() == "true"
-    if not enable_history:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Query history is disabled in application settings.",
+    _require_history()
+
+    query = db.query(TravelDocumentQuery).filter(
+        *_history_filters(origin, destination, since, until, document)
+    )
+    if cursor:
+        queried_at, query_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(TravelDocumentQuery.queried_at, TravelDocumentQuery.id)
+            < tuple_(queried_at, query_id)
         )
 
-    queries = db.query(TravelDocumentQuery).offset(skip).limit(limit).all()
-
-    # Convert JSON strings back to lists
-    result = []
-    for query in queries:
-        result.append(
-            {
-                "id": query.id,
-                "origin_country": query.origin_country,
-                "destination_country": query.destination_country,
-                "visa_documents": json.loads(query.visa_documents),
-                "passport_requirements": json.loads(query.passport_requirements),
-                "additional_documents": json.loads(query.additional_documents),
-                "travel_advisories": json.loads(query.travel_advisories),
-                "queried_at": query.queried_at,
-            }
+    queries = (
+        query.order_by(
+            TravelDocumentQuery.queried_at.desc(), TravelDocumentQuery.id.desc()
+        )
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    headers = {}
+    if len(queries) == limit and queries:
+        last = queries[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.queried_at, last.id)
+    return conditional_json(
+        request, queries, List[TravelDocumentQuerySchema], REVALIDATE, headers=headers
+    )
+
+
+@router.get(
+    "/history/export",
+    summary="Export query history",
+    response_class=StreamingResponse,
+)
+def export_query_history(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    document: Optional[str] = None,
+):
+    """
+    Stream every matching history row, oldest first, as NDJSON, CSV (document
+    lists as JSON arrays) or Parquet (one row group per chunk). Filters are the
+    same as /api/history's.
+
+    Rows are read through a server-side cursor and encoded chunk by chunk, so
+    memory use stays flat however large the export.
+    """
+    _require_history()
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet export requires pyarrow to be installed.",
         )
 
-    return result
+    filters = _history_filters(origin, destination, since, until, document)
+    return StreamingResponse(
+        export_history(format, filters),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="query-history.{format}"'
+        },
+    )
 
 
 # Application Config Endpoints (similar to SME example)
 @router.get("/settings", response_model=List[ApplicationConfigSchema])
-def get_all_settings(db: Session = Depends(get_db)):
+def get_all_settings(request: Request, db: Session = Depends(get_db)):
     settings = db.query(ApplicationConfig).all()
     for setting in settings:
-        if setting.config_key == "google_api_key" and setting.config_value:
+        if setting.config_key in SECRET_CONFIG_KEYS and setting.config_value:
             setting.config_value = "********"
-    return settings
+    return conditional_json(
+        request, settings, List[ApplicationConfigSchema], PRIVATE_REVALIDATE
+    )
+
+
+def _validate_settings(db: Session):
+    """Reject a change that would leave a setting unparseable, before it is committed."""
+    try:
+        config_store.validate(db)
+    except InvalidConfigValue as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)
+        )
 
 
 @router.post(
@@ -304,8 +561,11 @@ def create_setting(
         description=setting_create.description,
     )
     db.add(db_setting)
+    _validate_settings(db)
+    publish_config_change(db)
     db.commit()
     db.refresh(db_setting)
+    config_store.load(db)
     return db_setting
 
 
@@ -329,17 +589,20 @@ def update_setting(
     for key, value in update_data.items():
         if (
             key == "config_value"
-            and config_key == "google_api_key"
+            and config_key in SECRET_CONFIG_KEYS
             and value == "********"
         ):
             continue
         setattr(db_setting, key, value)
 
     db.add(db_setting)
+    _validate_settings(db)
+    publish_config_change(db)
     db.commit()
     db.refresh(db_setting)
+    config_store.load(db)
 
-    if db_setting.config_key == "google_api_key" and db_setting.config_value:
+    if db_setting.config_key in SECRET_CONFIG_KEYS and db_setting.config_value:
         db_setting.config_value = "********"
 
     return db_setting
@@ -0,0 +1,180 @@
+# backend/app/routing.py
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from .ratelimit import llm_rate_limiter
+
+# Weight of the newest observation in the latency and error moving averages
+EWMA_ALPHA = 0.2
+# A key or model whose moving error rate exceeds this is skipped for a while
+MAX_ERROR_RATE = 0.5
+# How long a throttled key, an unhealthy key or model, or a key the API
+# rejected (revoked or invalid) is avoided
+KEY_COOLDOWN_SECONDS = 5.0
+MODEL_COOLDOWN_SECONDS = 30.0
+REJECTED_KEY_COOLDOWN_SECONDS = 300.0
+
+
+class Route(NamedTuple):
+    api_key: str
+    model: str
+
+
+class TargetStats:
+    """Moving latency and error averages for one API key or one model."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.cooldown_until = 0.0
+
+    def record(self, latency_ms: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.error_rate += EWMA_ALPHA * (failed - self.error_rate)
+        if not failed:
+            self.latency_ms = (
+                latency_ms
+                if self.latency_ms is None
+                else self.latency_ms + EWMA_ALPHA * (latency_ms - self.latency_ms)
+            )
+
+    def cool_down(self, seconds: float):
+        self.cooldown_until = time.monotonic() + seconds
+
+    def cool_down_if_failing(self, seconds: float, too_slow: bool = False):
+        if self.error_rate > MAX_ERROR_RATE or too_slow:
+            self.cool_down(seconds)
+            # Start from a clean slate when the cool-down ends
+            self.error_rate = 0.0
+            self.latency_ms = None
+
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    def as_dict(self, name: str) -> dict:
+        return {
+            "name": name,
+            "available": self.available(),
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+        }
+
+
+class LLMRouter:
+    """
+    Spreads Gemini calls over a pool of API keys and an ordered list of models.
+
+    Keys are picked least-loaded first: fewest calls in flight relative to the
+    key's current adaptive rate limit, skipping keys that were just throttled,
+    keep failing or were rejected by the API.
+    Models are tried in configured order; one that keeps failing or whose
+    average latency exceeds llm_slow_call_ms is skipped for a cool-down period
+    so traffic falls back to the next (typically a faster flash-tier) model.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, TargetStats] = {}
+        self._models: Dict[str, TargetStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, targets: Dict[str, TargetStats], name: str) -> TargetStats:
+        stats = targets.get(name)
+        if stats is None:
+            stats = targets[name] = TargetStats()
+        return stats
+
+    def choose(
+        self, keys: Sequence[str], models: Sequence[str], slow_call_ms: float
+    ) -> Route:
+        with self._lock:
+            key_stats = {key: self._stats(self._keys, key) for key in keys}
+            ready = [key for key in keys if key_stats[key].available()] or list(keys)
+            api_key = min(
+                ready,
+                key=lambda key: (key_stats[key].in_flight + 1)
+                / llm_rate_limiter.requests_per_minute_for(key),
+            )
+
+            model = None
+            for name in models:
+                stats = self._stats(self._models, name)
+                if stats.available() and (
+                    stats.latency_ms is None or stats.latency_ms <= slow_call_ms
+                ):
+                    model = name
+                    break
+            if model is None:
+                # Every model is degraded: use the one that recovers first
+                model = min(models, key=lambda name: self._models[name].cooldown_until)
+            return Route(api_key, model)
+
+    def started(self, route: Route):
+        with self._lock:
+            self._stats(self._keys, route.api_key).in_flight += 1
+            self._stats(self._models, route.model).in_flight += 1
+
+    def abandoned(self, route: Route):
+        """Release a call that was cancelled; it says nothing about the route."""
+        with self._lock:
+            self._stats(self._keys, route.api_key).in_flight -= 1
+            self._stats(self._models, route.model).in_flight -= 1
+
+    def finished(
+        self,
+        route: Route,
+        latency_ms: float,
+        failed: bool = False,
+        throttled: bool = False,
+        key_rejected: bool = False,
+        slow_call_ms: Optional[float] = None,
+    ):
+        with self._lock:
+            key_stats = self._stats(self._keys, route.api_key)
+            model_stats = self._stats(self._models, route.model)
+            key_stats.in_flight -= 1
+            model_stats.in_flight -= 1
+            key_stats.record(latency_ms, failed)
+            # Quota and credentials are per key: move traffic to other keys,
+            # not other models
+            if throttled:
+                key_stats.throttled += 1
+                key_stats.cool_down(KEY_COOLDOWN_SECONDS)
+                return
+            if key_rejected:
+                key_stats.cool_down(REJECTED_KEY_COOLDOWN_SECONDS)
+                return
+            key_stats.cool_down_if_failing(MODEL_COOLDOWN_SECONDS)
+            model_stats.record(latency_ms, failed)
+            model_stats.cool_down_if_failing(
+                MODEL_COOLDOWN_SECONDS,
+                too_slow=slow_call_ms is not None
+                and model_stats.latency_ms is not None
+                and model_stats.latency_ms > slow_call_ms,
+            )
+
+    def stats(self) -> Dict[str, List[dict]]:
+        # Only the key suffix is reported so API keys never leave the process
+        with self._lock:
+            return {
+                "keys": [s.as_dict(f"...{key[-4:]}") for key, s in self._keys.items()],
+                "models": [s.as_dict(name) for name, s in self._models.items()],
+            }
+
+    def retain(self, keys: Sequence[str], models: Sequence[str]):
+        """Forget stats of keys and models that are no longer configured."""
+        with self._lock:
+            self._keys = {k: s for k, s in self._keys.items() if k in keys}
+            self._models = {m: s for m, s in self._models.items() if m in models}
+
+
+llm_router = LLMRouter()
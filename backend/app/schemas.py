@@ -1,7 +1,7 @@
 # backend/app/schemas.py
 import uuid
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -59,6 +59,9 @@ class TravelDocumentResponse(BaseSchema):
         ..., description="Additional required documents"
     )
     advisories: List[str] = Field(..., description="Travel advisories")
+    generated_at: Optional[datetime] = Field(
+        None, description="When a precomputed answer was generated"
+    )
 
 
 class TravelDocumentQuerySchema(BaseSchema):
@@ -70,3 +73,154 @@ class TravelDocumentQuerySchema(BaseSchema):
     additional_documents: List[str]
     travel_advisories: List[str]
     queried_at: datetime
+
+
+# Response Cache Schemas
+class CacheStatsSchema(BaseSchema):
+    size: int
+    max_entries: int
+    ttl_seconds: int
+    hits: int
+    shared_hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+    in_flight: int
+    leaders: int
+    coalesced: int
+
+
+class CacheInvalidationSchema(BaseSchema):
+    origin: str
+    destination: str
+    removed_entries: int
+    removed_precomputed: int
+
+
+# Corridor Precompute Schemas
+class PrecomputeStatusSchema(BaseSchema):
+    enabled: bool
+    running: bool
+    last_run_at: Optional[datetime]
+    selected_corridors: int
+    refreshed_corridors: int
+    failed_corridors: int
+
+
+# History Writer Schemas
+class HistoryWriterStatsSchema(BaseSchema):
+    queue_depth: int
+    queue_capacity: int
+    max_queue_depth: int
+    written: int
+    dropped: int
+    failed: int
+    batches: int
+    last_batch_size: int
+    last_flush_ms: float
+
+
+# Database Pool Schemas
+class PoolStatusSchema(BaseSchema):
+    name: str
+    pool_class: str
+    size: Optional[int] = None
+    checkedin: Optional[int] = None
+    checkedout: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+class DatabasePoolsSchema(BaseSchema):
+    pool_size: int
+    max_overflow: int
+    max_connections_per_worker: int
+    pools: List[PoolStatusSchema]
+
+
+# LLM Gateway Schemas
+class RateLimitStatusSchema(BaseSchema):
+    key: str
+    requests_per_minute: float
+
+
+class RouteTargetStatsSchema(BaseSchema):
+    name: str
+    available: bool
+    in_flight: int
+    calls: int
+    errors: int
+    throttled: int
+    error_rate: float
+    latency_ms: Optional[float] = None
+
+
+class LLMGatewayStatsSchema(BaseSchema):
+    circuit_state: str
+    consecutive_failures: int
+    retry_after_seconds: int
+    in_flight: int
+    max_concurrency: int
+    calls: int
+    retries: int
+    throttled: int
+    timeouts: int
+    failures: int
+    rejected: int
+    fallbacks: int
+    rate_limits: List[RateLimitStatusSchema]
+    keys: List[RouteTargetStatsSchema]
+    models: List[RouteTargetStatsSchema]
+
+
+class PromptTemplateStatsSchema(BaseSchema):
+    name: str
+    template_chars: int
+    calls: int
+    prompt_tokens: int
+    output_tokens: int
+    avg_prompt_tokens: float
+    avg_output_tokens: float
+
+
+# Admission Control Schemas
+class AdmissionClassStatsSchema(BaseSchema):
+    priority: str
+    queued: int
+    clients: int
+    admitted: int
+    rejected: Dict[str, int]
+
+
+class AdmissionStatsSchema(BaseSchema):
+    active: int
+    max_active: int
+    queued: int
+    queue_capacity: int
+    max_queue_depth: int
+    queue_timeout_seconds: float
+    client_requests_per_minute: int
+    service_seconds: float
+    classes: List[AdmissionClassStatsSchema]
+
+
+# Corridor Analytics Schemas
+class StatsSummarySchema(BaseSchema):
+    queries: int
+    corridors: int
+    answer_changes: int
+    distinct_answers: int
+    last_answered_at: Optional[datetime] = None
+
+
+class CorridorStatsSchema(BaseSchema):
+    origin: str
+    destination: str
+    queries: int
+    answer_changes: int
+    last_answered_at: datetime
+
+
+class DailyStatsSchema(BaseSchema):
+    day: date
+    queries: int
+    answer_changes: int
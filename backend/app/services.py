@@ -1,12 +1,28 @@
 # backend/app/services.py
-import json
-from typing import Any, Optional
+import logging
+import uuid
+from datetime import datetime
+from typing import AsyncIterator
 
-import google.generativeai as genai
 from fastapi import HTTPException, status
+from google.ai import generativelanguage as glm
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 
-from .models import ApplicationConfig, TravelDocumentQuery
+from .answers import UPSERT_INSERTS, canonical_answer
+from .cache import CacheKey
+from .config import ConfigSnapshot
+from .decoding import AnswerDecodeError, decode_answer
+from .gateway import llm_gateway
+from .llm import llm_clients
+from .metrics import record_llm_usage, stage
+from .routing import Route
+from .models import ApplicationConfig
+from .prompts import Prompt, build_repair_prompt, build_travel_prompt
+from .schemas import TravelDocumentRequest
+from .streaming import chunk_text
+
+logger = logging.getLogger(__name__)
 
 # Default configuration for Travel Documents Advisor
 DEFAULT_CONFIGS = [
@@ -15,11 +31,31 @@ DEFAULT_CONFIGS = [
         "config_value": "",
         "description": "Your Google AI API Key (required for Gemini models)",
     },
+    {
+        "config_key": "google_api_keys",
+        "config_value": "",
+        "description": "Comma-separated additional API keys; requests are spread over all keys",
+    },
     {
         "config_key": "llm_model",
         "config_value": "gemini-1.5-flash-latest",
         "description": "Which LLM model to use for document generation",
     },
+    {
+        "config_key": "llm_fallback_models",
+        "config_value": "gemini-1.5-flash-8b-latest",
+        "description": "Comma-separated models to fall back to, in order, when the primary model fails or is slow",
+    },
+    {
+        "config_key": "llm_slow_call_ms",
+        "config_value": "8000",
+        "description": "Average latency above which a model is skipped in favour of the next one",
+    },
+    {
+        "config_key": "llm_max_output_tokens",
+        "config_value": "4096",
+        "description": "Maximum tokens Gemini may generate per answer (0 for the model's limit); longer answers fail",
+    },
     {
         "config_key": "llm_temperature",
         "config_value": "0.3",
@@ -35,6 +71,111 @@ DEFAULT_CONFIGS = [
         "config_value": "English",
         "description": "Default language for responses",
     },
+    {
+        "config_key": "cache_ttl_seconds",
+        "config_value": "86400",
+        "description": "How long a cached answer for a corridor stays fresh",
+    },
+    {
+        "config_key": "cache_max_entries",
+        "config_value": "1000",
+        "description": "Maximum number of answers kept in the in-process cache",
+    },
+    {
+        "config_key": "enable_shared_cache",
+        "config_value": "true",
+        "description": "Whether to reuse fresh answers from query history across workers",
+    },
+    {
+        "config_key": "batch_concurrency",
+        "config_value": "8",
+        "description": "Maximum concurrent LLM calls per /api/ask/batch request",
+    },
+    {
+        "config_key": "llm_requests_per_minute",
+        "config_value": "60",
+        "description": "Maximum Gemini calls per minute per API key, for every kind of request",
+    },
+    {
+        "config_key": "enable_precompute",
+        "config_value": "false",
+        "description": "Whether to precompute answers for popular corridors in the background",
+    },
+    {
+        "config_key": "precompute_top_n",
+        "config_value": "50",
+        "description": "Number of most-asked corridors from history to precompute",
+    },
+    {
+        "config_key": "precompute_countries",
+        "config_value": "",
+        "description": "Comma-separated countries whose pairwise corridors are always precomputed",
+    },
+    {
+        "config_key": "precompute_interval_seconds",
+        "config_value": "3600",
+        "description": "How often the precompute worker checks for stale corridors",
+    },
+    {
+        "config_key": "precompute_max_age_seconds",
+        "config_value": "86400",
+        "description": "Age after which a precomputed answer is no longer served",
+    },
+    {
+        "config_key": "history_flush_interval_ms",
+        "config_value": "250",
+        "description": "Maximum time a history row waits before being written",
+    },
+    {
+        "config_key": "history_batch_size",
+        "config_value": "200",
+        "description": "Maximum number of history rows written per bulk insert",
+    },
+    {
+        "config_key": "llm_max_concurrency",
+        "config_value": "16",
+        "description": "Maximum number of Gemini calls in flight per worker",
+    },
+    {
+        "config_key": "llm_timeout_seconds",
+        "config_value": "30",
+        "description": "Timeout for a single Gemini call",
+    },
+    {
+        "config_key": "llm_max_retries",
+        "config_value": "2",
+        "description": "Retries for Gemini calls that fail with 429, 5xx or a timeout",
+    },
+    {
+        "config_key": "circuit_failure_threshold",
+        "config_value": "5",
+        "description": "Consecutive failed Gemini calls before requests fail fast",
+    },
+    {
+        "config_key": "circuit_reset_seconds",
+        "config_value": "30",
+        "description": "How long requests fail fast before Gemini is probed again",
+    },
+    {
+        "config_key": "admission_max_active",
+        "config_value": "16",
+        "description": "Maximum /api/ask requests generating an answer at once per worker; the rest queue",
+    },
+    {
+        "config_key": "admission_queue_capacity",
+        "config_value": "256",
+        "description": "Maximum queued /api/ask requests per worker before load is shed",
+    },
+    {
+        "config_key": "admission_queue_timeout_seconds",
+        "config_value": "10",
+        "description": "How long a request may queue before it is rejected with 503 Retry-After",
+    },
+    {
+        "config_key": "client_requests_per_minute",
+        "config_value": "0",
+        "description": "Per-client quota of answers generated per minute (0 for no quota)",
+    },
 ]
 
 
@@ -74,109 +215,168 @@ def seed_default_configs(db: Session):
     db.commit()
 
 
-def get_config_value(
-    db: Session, config_key: str, default: Optional[Any] = None
-) -> Optional[Any]:
-    """Retrieve a configuration value from the database."""
-    config_item = (
-        db.query(ApplicationConfig)
-        .filter(ApplicationConfig.config_key == config_key)
-        .first()
-    )
-    return config_item.config_value if config_item else default
+def add_missing_configs(db: Session) -> int:
+    """
+    Insert the DEFAULT_CONFIGS settings the table does not have yet, such as
+    ones added by an upgrade, leaving existing values untouched.
+    """
+    existing = set(db.scalars(select(ApplicationConfig.config_key)))
+    rows = [
+        {"id": cfg["config_key"], **cfg}
+        for cfg in DEFAULT_CONFIGS
+        if cfg["config_key"] not in existing
+    ]
+    if not rows:
+        return 0
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        db.execute(insert(ApplicationConfig), rows)
+    else:
+        # Workers starting together race to add the same settings
+        db.execute(dialect_insert(ApplicationConfig).on_conflict_do_nothing(), rows)
+    db.commit()
+    logger.info("Added %d new default settings", len(rows))
+    return len(rows)
 
 
-def get_google_api_key(db: Session) -> str:
-    """Retrieve the Google API key from the database."""
-    api_key = get_config_value(db, "google_api_key")
-    if not api_key:
+def require_complete(finish_reason):
+    """
+    Reject an answer Gemini stopped writing at llm_max_output_tokens. It may
+    still decode, or be repaired, into a plausible but incomplete answer,
+    which must not be cached or recorded.
+    """
+    if finish_reason == glm.Candidate.FinishReason.MAX_TOKENS:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Google API key is not configured. Please set it in the application settings.",
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Gemini response was cut off at llm_max_output_tokens",
         )
-    return api_key
-
-
-def query_travel_documents(db: Session, origin: str, destination: str) -> dict:
-    """Query the LLM for travel document requirements between two countries."""
-    api_key = get_google_api_key(db)
-    llm_model = get_config_value(db, "llm_model", "gemini-1.5-flash-latest")
-    temperature = float(get_config_value(db, "llm_temperature", "0.3"))
-    enable_history = get_config_value(db, "enable_history", "true").lower() == "true"
-    response_language = get_config_value(db, "default_response_language", "English")
-
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel(llm_model)
-
-    prompt = f"""
-    Provide a detailed list of travel document requirements for traveling from {origin} to {destination}.
-    Structure your response as a JSON object with exactly these four fields:
-    - "visa_documents": array of strings listing required visa application documents
-    - "passport_requirements": array of strings listing passport requirements
-    - "additional_documents": array of strings listing other required documents
-    - "advisories": array of strings listing important travel advisories
-    
-    All responses should be in {response_language} language.
-    Be concise but thorough. Include any COVID-19 requirements if applicable.
-    """
 
-    try:
-        response = model.generate_content(
-            prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=temperature,
-            ),
+
+def extract_response_text(response) -> str:
+    """Return the text of the first candidate of a complete Gemini response."""
+    if not response or not response.candidates:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="No response received from Gemini API",
         )
+    require_complete(response.candidates[0].finish_reason)
 
-        # Parse the response
-        if response and response.candidates:
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, "text"):
-                    try:
-                        result = json.loads(part.text)
-                        # Validate the structure
-                        if not all(
-                            key in result
-                            for key in [
-                                "visa_documents",
-                                "passport_requirements",
-                                "additional_documents",
-                                "advisories",
-                            ]
-                        ):
-                            raise ValueError("Invalid response structure from LLM")
-
-                        # Save to history if enabled
-                        if enable_history:
-                            db_query = TravelDocumentQuery(
-                                origin_country=origin,
-                                destination_country=destination,
-                                visa_documents=json.dumps(result["visa_documents"]),
-                                passport_requirements=json.dumps(
-                                    result["passport_requirements"]
-                                ),
-                                additional_documents=json.dumps(
-                                    result["additional_documents"]
-                                ),
-                                travel_advisories=json.dumps(result["advisories"]),
-                            )
-                            db.add(db_query)
-                            db.commit()
-
-                        return result
-                    except json.JSONDecodeError:
-                        raise HTTPException(
-                            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Failed to parse LLM response as JSON",
-                        )
+    # Extract text from the first candidate
+    response_text = ""
+    for part in response.candidates[0].content.parts:
+        if hasattr(part, "text"):
+            response_text = part.text
+            break
 
+    if not response_text:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="No valid response received from LLM",
+            detail="Empty response from Gemini API",
         )
+    return response_text
+
 
-    except Exception as e:
+def decode_travel_answer(response_text: str) -> dict:
+    """Parse and validate the JSON answer produced by the LLM."""
+    try:
+        return decode_answer(response_text)
+    except AnswerDecodeError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error querying LLM: {str(e)}",
+            detail=f"Failed to parse Gemini response: {str(e)}",
         )
+
+
+async def generate_content(config: ConfigSnapshot, prompt: Prompt):
+    """Send a prompt to Gemini over the least-loaded key and healthiest model."""
+
+    async def request(route: Route):
+        # Reuse a warm Gemini client for this key, model and generation settings
+        with stage("client_setup"):
+            model = llm_clients.get_model(
+                route.api_key,
+                route.model,
+                config.llm_temperature,
+                config.llm_max_output_tokens,
+            )
+        response = await model.generate_content_async(prompt.text)
+        record_llm_usage(route.model, prompt.template, response)
+        return response
+
+    with stage("llm_call"):
+        return await llm_gateway.call(request)
+
+
+async def parse_travel_answer(config: ConfigSnapshot, response_text: str) -> dict:
+    """
+    Decode an LLM answer, repairing it locally where possible. Only when that
+    fails is the model asked, with a short repair prompt, to reformat it once.
+    """
+    try:
+        with stage("parse"):
+            return decode_answer(response_text)
+    except AnswerDecodeError as e:
+        logger.warning("Repairing undecodable Gemini response: %s", e)
+
+    response = await generate_content(config, build_repair_prompt(response_text))
+    with stage("parse"):
+        return decode_travel_answer(extract_response_text(response))
+
+
+def build_history_values(
+    request: TravelDocumentRequest, result: dict, cache_key: CacheKey, source: str = "llm"
+) -> dict:
+    """
+    Build the values recording an answer for a request. The history writer
+    moves "answer" into travel_answers and keeps only its hash on the row.
+    """
+    return {
+        "id": uuid.uuid4(),
+        "origin_country": request.origin,
+        "destination_country": request.destination,
+        "answer": canonical_answer(result),
+        "queried_at": datetime.utcnow(),
+        "cache_key": cache_key.digest,
+        "source": source,
+    }
+
+
+async def generate_travel_text(
+    config: ConfigSnapshot, request: TravelDocumentRequest
+) -> str:
+    """Ask Gemini for the travel document requirements of a corridor."""
+    config.require_google_api_key()
+    with stage("prompt"):
+        prompt = build_travel_prompt(request, config.default_response_language)
+
+    # Make the API call to Gemini through the shared gateway
+    response = await generate_content(config, prompt)
+    return extract_response_text(response)
+
+
+async def stream_travel_text(
+    config: ConfigSnapshot, request: TravelDocumentRequest
+) -> AsyncIterator[str]:
+    """Streaming variant of generate_travel_text, yielding text as Gemini produces it."""
+    config.require_google_api_key()
+    prompt = build_travel_prompt(request, config.default_response_language)
+
+    async with llm_gateway.stream() as route:
+        model = llm_clients.get_model(
+            route.api_key,
+            route.model,
+            config.llm_temperature,
+            config.llm_max_output_tokens,
+        )
+        response = await llm_gateway.wait(
+            model.generate_content_async(prompt.text, stream=True)
+        )
+        finish_reason = None
+        async for chunk in llm_gateway.chunks(response):
+            if chunk.candidates:
+                finish_reason = chunk.candidates[0].finish_reason
+            yield chunk_text(chunk)
+        record_llm_usage(route.model, prompt.template, response)
+
+    # Checked after the stream ends: a truncated answer is no fault of the route
+    require_complete(finish_reason)
@@ -0,0 +1,181 @@
+# backend/app/singleflight.py
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+# Published results only serve workers that were blocked on the lock while
+# the leader ran, so files older than this are swept, at most once a minute
+RESULT_TTL_SECONDS = 300
+SWEEP_INTERVAL_SECONDS = 60
+
+# Waiting on another worker's leader polls the lock instead of parking a
+# thread in flock; past the deadline the waiter makes its own call
+LOCK_POLL_SECONDS = 0.01
+LOCK_POLL_MAX_SECONDS = 0.25
+LOCK_WAIT_SECONDS = 120
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one upstream call.
+
+    Within a process, followers await the leader's future. Across uvicorn
+    workers, leaders serialize on a per-key file lock and publish their result
+    to a file next to it, so a worker that was waiting on the lock reuses the
+    answer instead of making its own call. Waiting polls the lock on the event
+    loop, so any number of contended keys costs no threads. Leaders
+    periodically delete result and lock files that have not been used for
+    RESULT_TTL_SECONDS.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None):
+        self.lock_dir = lock_dir or os.path.join(
+            tempfile.gettempdir(), "travel-docs-singleflight"
+        )
+        self._calls: Dict[str, asyncio.Future] = {}
+        self._last_sweep = 0.0
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        call = self._calls.get(key)
+        if call is not None:
+            self.coalesced += 1
+            # Shield so a cancelled follower does not cancel the shared call
+            return await asyncio.shield(call)
+
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        self.leaders += 1
+        try:
+            result = await self._run_exclusive(key, fn)
+            call.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except Exception as e:
+            call.set_exception(e)
+            # Followers re-raise it; mark retrieved so asyncio does not warn
+            call.exception()
+            raise
+        finally:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+    async def _run_exclusive(self, key: str, fn: Callable[[], Awaitable[dict]]) -> dict:
+        if fcntl is None:
+            return await fn()
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+        waiting_since = time.time()
+
+        lock_file = await self._lock(lock_path)
+        try:
+            # Another worker finished the same call while we were waiting
+            published = self._read_result(result_path, waiting_since)
+            if published is not None:
+                self.coalesced += 1
+                return published
+
+            result = await fn()
+            self._write_result(result_path, result)
+            return result
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+            self._maybe_sweep()
+
+    @staticmethod
+    async def _lock(path: str):
+        """
+        Open and lock the file at `path`, retrying if it is swept meanwhile.
+        Returns None if another worker still holds it after LOCK_WAIT_SECONDS.
+        """
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        delay = LOCK_POLL_SECONDS
+        while True:
+            lock_file = open(path, "a")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                if time.monotonic() >= deadline:
+                    return None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LOCK_POLL_MAX_SECONDS)
+                continue
+            try:
+                if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    return lock_file
+            except FileNotFoundError:
+                pass
+            # The sweeper unlinked this file while we waited on it
+            lock_file.close()
+
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        asyncio.get_running_loop().run_in_executor(
+            None, self._sweep, now - RESULT_TTL_SECONDS
+        )
+
+    def _sweep(self, cutoff: float):
+        """Delete result files older than `cutoff` and old locks nobody holds."""
+        try:
+            names = os.listdir(self.lock_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if os.path.getmtime(path) >= cutoff:
+                    continue
+                if not name.endswith(".lock"):
+                    os.unlink(path)
+                    continue
+                # Only unlink a lock nobody holds or waits on; _lock() notices
+                # the unlink if someone opens it in the meantime
+                with open(path, "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.unlink(path)
+            except OSError:
+                continue  # in use, or already removed by another worker
+
+    @staticmethod
+    def _read_result(path: str, not_before: float) -> Optional[dict]:
+        try:
+            if os.path.getmtime(path) < not_before:
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_result(path: str, result: dict):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, path)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,95 @@
+# backend/app/streaming.py
+import json
+from typing import Iterator, List, Optional
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+ANSWER_SECTIONS = (
+    "visa_documents",
+    "passport_requirements",
+    "additional_documents",
+    "advisories",
+)
+
+
+def ndjson_line(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def chunk_text(chunk) -> str:
+    """Concatenate the text parts of a streamed Gemini chunk."""
+    if not chunk.candidates:
+        return ""
+    return "".join(
+        part.text for part in chunk.candidates[0].content.parts if hasattr(part, "text")
+    )
+
+
+def answer_events(result: dict) -> Iterator[dict]:
+    """Replay a complete answer as the same events a live stream produces."""
+    for section in ANSWER_SECTIONS:
+        for value in result[section]:
+            yield {"event": "item", "section": section, "value": value}
+    yield {"event": "done", "result": result}
+
+
+class SectionStreamParser:
+    """
+    Incremental scanner over a streamed JSON answer.
+
+    It tracks just enough JSON structure (nesting, strings, escapes and the
+    current top-level key) to emit each string item of the answer sections the
+    moment its closing quote arrives. Anything outside the top-level object,
+    such as markdown fences, is ignored. The full text is kept so the caller
+    can validate the complete answer once the stream ends.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._token: List[str] = []
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, text: str) -> List[dict]:
+        self._chunks.append(text)
+        events = []
+        for ch in text:
+            if self._in_string:
+                self._token.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    event = self._on_string("".join(self._token))
+                    if event:
+                        events.append(event)
+            elif ch == '"' and self._stack:
+                self._in_string = True
+                self._token = [ch]
+            elif ch in "{[":
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+            elif ch == ":" and self._stack == ["{"]:
+                self._key = self._last_string
+        return events
+
+    def _on_string(self, token: str) -> Optional[dict]:
+        try:
+            value = json.loads(token)
+        except ValueError:
+            return None
+        if self._stack == ["{"]:
+            self._last_string = value
+        elif self._stack == ["{", "["] and self._key in ANSWER_SECTIONS:
+            return {"event": "item", "section": self._key, "value": value}
+        return None
@@ -0,0 +1,96 @@
+# backend/benchmarks/ask_modes.py
+"""
+Compare a blocking and an async Gemini client behind the real /api/ask.
+
+The app runs in-process behind httpx's ASGI transport with its normal
+lifespan, as in benchmarks.load_test, with answer caches off so every
+request reaches the fake Gemini model. In "sync" mode the model blocks a
+threadpool thread for the whole generation, as the route did when it called
+the blocking generate_content from a sync handler; in "async" mode it
+awaits on the event loop like generate_content_async. Admission and the LLM
+gateway allow the full concurrency, so the threadpool is the only cap.
+Run from backend/:
+
+    python -m benchmarks.ask_modes --concurrency 200 --latency 1.0 --threads 40
+"""
+import argparse
+import asyncio
+import random
+import json
+import time
+
+import anyio
+import httpx
+
+from benchmarks.load_test import (
+    FakeGenerativeModel,
+    QueryCounter,
+    configure_database,
+    prepare_schema,
+    run_phase,
+)
+
+
+class BlockingGenerativeModel(FakeGenerativeModel):
+    """Holds a threadpool thread for the whole generation, like generate_content."""
+
+    async def generate(self, seconds: float):
+        await anyio.to_thread.run_sync(time.sleep, seconds)
+
+
+async def run(args: argparse.Namespace):
+    from app.llm import llm_clients
+    from app.main import app
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threads
+    queries = QueryCounter()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+            for mode, model_class in (
+                ("sync", BlockingGenerativeModel),
+                ("async", FakeGenerativeModel),
+            ):
+                model = model_class(args, random.Random(args.seed))
+                llm_clients.get_model = lambda api_key, model_name, *settings: model
+
+                def ask(i: int, mode=mode):
+                    # Distinct corridors, so single-flight never merges requests
+                    return client.post(
+                        "/api/ask",
+                        json={"origin": f"{mode} origin {i}", "destination": "Ireland"},
+                    )
+
+                result = await run_phase(mode, ask, args, queries)
+                result["llm_calls"] = model.calls
+                print(json.dumps(result))
+
+
+def main(args: argparse.Namespace):
+    args.requests = args.requests or args.concurrency
+    args.cache = False
+    args.error_rate = args.malformed_rate = 0.0
+    url = configure_database(args)
+    prepare_schema(
+        url,
+        args,
+        {
+            "admission_max_active": str(args.concurrency),
+            "admission_queue_capacity": str(args.requests),
+        },
+    )
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, help="per mode; defaults to --concurrency")
+    parser.add_argument("--latency", type=float, default=1.0, help="fake LLM seconds")
+    parser.add_argument("--threads", type=int, default=40, help="Starlette threadpool size")
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,121 @@
+# backend/benchmarks/country_cache.py
+"""
+Measure how often near-duplicate corridors reuse a cached answer.
+
+Warms the cache with every pair of a sample of ISO countries, then replays
+queries whose names are aliases, ISO codes, case variants or misspellings.
+Reports the hit rate of the old exact-string key and of the normalized key
+(alias and fuzzy resolution), with the per-lookup cost of each. A hit is wrong when it serves a
+corridor other than the one the query meant, e.g. Austria's answer for a
+misspelled Australia; wrong_rate is the share of queries answered that way
+and should stay at zero. Run from backend/:
+
+    python -m benchmarks.country_cache --countries 60 --queries 5000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from itertools import permutations
+
+from app.cache import normalize_country
+from app.countries import COUNTRY_ALIASES, ISO_COUNTRIES
+
+ALIASES_BY_CODE = {}
+for alias, code in COUNTRY_ALIASES.items():
+    ALIASES_BY_CODE.setdefault(code, []).append(alias)
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Drop, double or swap one letter of a name."""
+    if len(name) < 5:
+        return name
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.choice(("drop", "double", "swap"))
+    if edit == "drop":
+        return name[:i] + name[i + 1 :]
+    if edit == "double":
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+def variant(code: str, rng: random.Random) -> str:
+    name = ISO_COUNTRIES[code]
+    kind = rng.choice(("exact", "case", "code", "alias", "typo"))
+    if kind == "case":
+        return f"  {name.upper()} "
+    if kind == "code":
+        return code
+    if kind == "alias" and code in ALIASES_BY_CODE:
+        return rng.choice(ALIASES_BY_CODE[code])
+    if kind == "typo":
+        return misspell(name, rng)
+    return name
+
+
+def summarize(
+    strategy: str, hits: int, wrong: int, queries: int, latencies: list
+) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "strategy": strategy,
+        "queries": queries,
+        "hit_rate": round(hits / queries, 4),
+        "wrong_rate": round(wrong / queries, 4),
+        "mean_us": round(statistics.fmean(latencies) * 1e6, 1),
+        "p99_us": round(quantiles[98] * 1e6, 1),
+    }
+
+
+def main(args: argparse.Namespace):
+    rng = random.Random(args.seed)
+    codes = rng.sample(sorted(ISO_COUNTRIES), min(args.countries, len(ISO_COUNTRIES)))
+    corridors = list(permutations(codes, 2))
+
+    exact = {(ISO_COUNTRIES[o], ISO_COUNTRIES[d]) for o, d in corridors}
+    normalized = {
+        (normalize_country(ISO_COUNTRIES[o]), normalize_country(ISO_COUNTRIES[d]))
+        for o, d in corridors
+    }
+
+    # Each query with the normalized corridor it means
+    queries = [
+        (
+            (variant(o, rng), variant(d, rng)),
+            (normalize_country(ISO_COUNTRIES[o]), normalize_country(ISO_COUNTRIES[d])),
+        )
+        for o, d in (rng.choice(corridors) for _ in range(args.queries))
+    ]
+
+    # Each lookup returns the normalized corridor whose answer it serves
+    def exact_lookup(origin, destination):
+        if (origin, destination) in exact:
+            return normalize_country(origin), normalize_country(destination)
+        return None
+
+    def normalized_lookup(origin, destination):
+        key = (normalize_country(origin), normalize_country(destination))
+        return key if key in normalized else None
+
+    for strategy, lookup in (
+        ("exact", exact_lookup),
+        ("normalized", normalized_lookup),
+    ):
+        hits, wrong, latencies = 0, 0, []
+        for (origin, destination), meant in queries:
+            started = time.perf_counter()
+            served = lookup(origin, destination)
+            latencies.append(time.perf_counter() - started)
+            if served is not None:
+                hits += 1
+                wrong += served != meant
+        print(json.dumps(summarize(strategy, hits, wrong, len(queries), latencies)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--countries", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    main(parser.parse_args())
@@ -0,0 +1,314 @@
+# backend/benchmarks/load_test.py
+"""
+Load-test the real FastAPI app against a fake Gemini backend.
+
+The app runs in-process behind httpx's ASGI transport with its normal
+lifespan (config load, history writer, caches), on SQLite or a local
+Postgres. Gemini is replaced by a fake model with configurable latency,
+error rate and malformed-output rate. /api/ask, /api/history and
+/api/recent-queries are driven in turn at the given concurrency; each phase
+reports p50/p95/p99 latency, throughput, status codes and DB queries per
+request. Run from backend/:
+
+    python -m benchmarks.load_test --requests 500 --concurrency 50 --output run.json
+    python -m benchmarks.load_test --database-url postgresql+psycopg2://... --baseline run.json
+
+A Postgres database is migrated with `alembic upgrade head` first; a SQLite
+database is created from the models in a temporary directory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from itertools import permutations
+from types import SimpleNamespace
+from typing import Optional
+
+import httpx
+from google.ai import generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
+
+# `app` modules are imported inside functions: app.session reads DATABASE_URL
+# at import time, so the benchmark database must be configured first
+
+STUB_ANSWER = {
+    "visa_documents": ["Valid visa application form", "Passport photos"],
+    "passport_requirements": ["Valid for 6 months", "2 blank pages"],
+    "additional_documents": ["Return ticket", "Proof of funds"],
+    "advisories": ["Check entry requirements", "Register with embassy"],
+}
+
+CORRIDOR_COUNTRIES = (
+    "Kenya",
+    "Ireland",
+    "Germany",
+    "Japan",
+    "Brazil",
+    "Canada",
+    "India",
+    "France",
+    "Nigeria",
+    "Mexico",
+    "Australia",
+    "Egypt",
+)
+
+
+def malformed(text: str, rng: random.Random) -> str:
+    """Damage an answer the way LLMs do: fences, trailing commas or truncation."""
+    defect = rng.choice(("fenced", "trailing_comma", "truncated"))
+    if defect == "fenced":
+        return f"Here is the answer:\n```json\n{text}\n```"
+    if defect == "trailing_comma":
+        return text.replace('"]', '",]')
+    return text[: text.rindex('"') + 1]
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel; answers look like real Gemini responses."""
+
+    def __init__(self, args: argparse.Namespace, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.calls = 0
+
+    async def generate(self, seconds: float):
+        """Spend the generation latency; subclasses change how it is spent."""
+        await asyncio.sleep(seconds)
+
+    async def generate_content_async(self, prompt: str, **kwargs):
+        self.calls += 1
+        await self.generate(self.args.latency * self.rng.uniform(0.8, 1.2))
+        if self.rng.random() < self.args.error_rate:
+            raise self.rng.choice(
+                (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+            )("fake upstream error")
+
+        text = json.dumps(STUB_ANSWER)
+        if self.rng.random() < self.args.malformed_rate:
+            text = malformed(text, self.rng)
+        part = SimpleNamespace(text=text)
+        return SimpleNamespace(
+            candidates=[
+                SimpleNamespace(
+                    content=SimpleNamespace(parts=[part]),
+                    finish_reason=glm.Candidate.FinishReason.STOP,
+                )
+            ],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=len(prompt) // 4,
+                candidates_token_count=len(text) // 4,
+                total_token_count=(len(prompt) + len(text)) // 4,
+            ),
+        )
+
+
+def configure_database(args: argparse.Namespace) -> str:
+    """Point the app at the benchmark database; must run before `app` is imported."""
+    url = args.database_url
+    if url is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="travel-docs-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("DATABASE_READ_URL", None)
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    return url
+
+
+def prepare_schema(url: str, args: argparse.Namespace, settings: Optional[dict] = None):
+    from app.models import ApplicationConfig
+    from app.services import seed_default_configs
+    from app.session import Base, SessionLocal, engine
+
+    if url.startswith("sqlite"):
+        Base.metadata.create_all(engine)
+    else:
+        subprocess.run(["alembic", "upgrade", "head"], check=True, env=os.environ)
+
+    overrides = {
+        "google_api_key": "bench-key",
+        "google_api_keys": "",
+        "llm_fallback_models": "",
+        "enable_history": "true",
+        "enable_precompute": "false",
+        "enable_shared_cache": "true" if args.cache else "false",
+        "cache_max_entries": "1000" if args.cache else "0",
+        "llm_requests_per_minute": "1000000",
+        "llm_max_concurrency": str(args.concurrency),
+        **(settings or {}),
+    }
+    with SessionLocal() as db:
+        seed_default_configs(db)
+        for key, value in overrides.items():
+            db.query(ApplicationConfig).filter(
+                ApplicationConfig.config_key == key
+            ).update({"config_value": value})
+        db.commit()
+
+
+class QueryCounter:
+    """Counts SQL statements executed on every engine the app uses."""
+
+    def __init__(self):
+        from sqlalchemy import event
+
+        from app.session import async_engine, engine, read_engine
+
+        self.count = 0
+        for target in {engine, read_engine, async_engine.sync_engine}:
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+async def run_phase(name: str, make_request, args, queries: QueryCounter) -> dict:
+    latencies = []
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    queries_before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "phase": name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 1),
+        "p95_ms": round(quantiles[94] * 1000, 1),
+        "p99_ms": round(quantiles[98] * 1000, 1),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "db_queries_per_request": round((queries.count - queries_before) / args.requests, 2),
+    }
+
+
+async def run(args: argparse.Namespace, url: str) -> dict:
+    from app.history import history_writer
+    from app.llm import llm_clients
+    from app.main import app
+
+    rng = random.Random(args.seed)
+    fake_model = FakeGenerativeModel(args, rng)
+    llm_clients.get_model = lambda api_key, model_name, *settings: fake_model
+    queries = QueryCounter()
+    corridors = list(permutations(CORRIDOR_COUNTRIES, 2))[: args.corridors]
+
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+
+            def ask(i: int):
+                origin, destination = corridors[i % len(corridors)]
+                return client.post(
+                    "/api/ask", json={"origin": origin, "destination": destination}
+                )
+
+            results.append(await run_phase("ask", ask, args, queries))
+            results[-1]["llm_calls"] = fake_model.calls
+
+            # Let the write-behind history writer catch up before reading history
+            await history_writer.stop()
+            history_writer.start()
+
+            results.append(
+                await run_phase(
+                    "history",
+                    lambda i: client.get("/api/history", params={"limit": 20}),
+                    args,
+                    queries,
+                )
+            )
+            results.append(
+                await run_phase(
+                    "recent_queries",
+                    lambda i: client.get("/api/recent-queries"),
+                    args,
+                    queries,
+                )
+            )
+
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "database": url.split(":", 1)[0],
+        "settings": {
+            key: value for key, value in vars(args).items() if key not in ("output", "baseline")
+        },
+        "results": results,
+    }
+
+
+def compare(run_result: dict, baseline_path: str):
+    """Print the change of each phase's latency and throughput against a saved run."""
+    with open(baseline_path) as f:
+        baseline = {r["phase"]: r for r in json.load(f)["results"]}
+    for result in run_result["results"]:
+        before = baseline.get(result["phase"])
+        if before is None:
+            continue
+        print(
+            json.dumps(
+                {
+                    "phase": result["phase"],
+                    **{
+                        f"{metric}_change_pct": round(
+                            (result[metric] - before[metric]) / before[metric] * 100, 1
+                        )
+                        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+                        if before[metric]
+                    },
+                }
+            )
+        )
+
+
+def main(args: argparse.Namespace):
+    url = configure_database(args)
+    prepare_schema(url, args)
+    result = asyncio.run(run(args, url))
+    for phase in result["results"]:
+        print(json.dumps(phase))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        compare(result, args.baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--requests", type=int, default=500, help="requests per phase")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--corridors", type=int, default=100, help="distinct ask corridors")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake LLM seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false", help="disable answer caches"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the run as JSON to this file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare with")
+    main(parser.parse_args())
@@ -35,7 +35,8 @@ api.interceptors.response.use(
 export default {
   // Document Generation
   generateDocuments(payload) {
-    return api.post('/ask', payload)
+    // Someone is waiting on this answer: queue ahead of API and batch callers
+    return api.post('/ask/interactive', payload)
   },
 
   // History